@@ -1,72 +1,557 @@
 """
 app/core/cache.py
 
-Simple in-memory TTL cache for API responses.
+TTL cache for API responses.
 
-The `cached` decorator wraps async route handlers and caches their return value
-for `ttl` seconds, keyed by function name + arguments.
+The `cached` decorator wraps async route handlers and caches their response
+for `ttl` seconds, keyed by function name + arguments. Keys are plain tuples
+looked up in a dict; they are only hashed to strings by shared backends. What
+is cached is the final encoded body (JSON, as FastAPI would render it) plus
+gzip/brotli variants for large text bodies, so a hit returns a raw `Response`
+without re-validating or re-serializing anything. The variant is picked from
+the request's Accept-Encoding.
+
+Concurrent misses for the same key are coalesced (single-flight): the first
+caller starts the computation, every other caller awaits the same task instead
+of running the handler again.
+
+Entries live in a pluggable backend (app/core/cache_backends.py), chosen with
+`CACHE_BACKEND`: a bounded per-process LRU (`memory`, the default), or a store
+shared by every uvicorn worker (`sqlite` in WAL mode, or `redis`) holding
+the same encoded bodies. A background sweeper (started from the app
+lifespan) drops expired entries every `CACHE_SWEEP_INTERVAL` seconds.
+
+Per-function counters (hits, misses, stale serves, in-flight waits, evictions,
+bytes held, time spent computing misses) are exposed by `stats()` and served
+at /api/v1/cache/stats. They are per worker process.
+
+Stale-while-revalidate: with `stale_ttl`, an entry that expired less than
+`stale_ttl` seconds ago is still served immediately while a single background
+task recomputes it, so callers never wait on a cold handler for hot keys.
+
+Data-version tagging: with `version`, each entry is tagged with a token
+describing the data it was computed from (e.g. the mtimes of a ticker's
+ingestion outputs). An entry whose tag no longer matches the current token is
+treated as a miss, so TTLs can be long without serving outdated data.
+
+Conditional requests: with `version`, responses carry a strong `ETag` built
+from the cache key (function + arguments), the data version and the deploy
+(app version + `BUILD_ID`: a release may render the same data differently),
+and a `Last-Modified` header when the version callable also returns one. A
+request whose `If-None-Match` (or, without one, `If-Modified-Since`) still
+matches gets an empty `304 Not Modified` before any cache lookup or
+computation. Compressed variants get their own ETag (`"<tag>-gzip"`,
+`"<tag>-br"`); all of them validate.
 
 Usage:
     @cached(ttl=60)
     async def my_handler(ticker: str):
         ...
 
-Note: This is a lightweight in-memory cache — data is lost on server restart.
-For production, swap the store for Redis (e.g. via fastapi-cache2).
+    @cached(ttl=60, stale_ttl=600)   # serve up to 10 min stale while refreshing
+    async def my_slow_handler(ticker: str):
+        ...
+
+    @cached(ttl=3600, version=lambda ticker: data_version(ticker))
+    async def my_data_handler(ticker: str):
+        ...
+
+    # (version, last modified) from one look at the files
+    @cached(ttl=3600, version=lambda ticker: data_stamp(ticker))
+    async def my_polled_handler(ticker: str):
+        ...
+
+Note: with the default memory backend, data is lost on server restart and
+each worker has its own copy. Single-flight and background refreshes are
+always per-process.
 """
 from __future__ import annotations
 
 import asyncio
 import functools
+import gzip
 import hashlib
+import inspect
 import json
+import logging
+import os
 import time
-from typing import Any, Callable
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.cache_backends import (
+    NAMESPACE, CacheBackend, CacheEntry, CacheKey, fn_name, make_backend,
+)
+from app.core.config import settings
+
+try:  # optional: brotli variants are only produced when the package is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+
+log = logging.getLogger(__name__)
+
+_backend: CacheBackend = make_backend()
+_sweeper: asyncio.Task | None = None
+
+# Name of the Request parameter injected into wrapped handlers' signatures
+_REQUEST_PARAM = "_cache_request"
+
+# { (cache_key, data_version): task currently computing that key }
+_inflight: dict[tuple[CacheKey, str | None], asyncio.Task] = {}
+
+# { function name: Counter(hits=, stale_hits=, misses=, inflight_waits=,
+#                          bypassed=, not_modified=, computes=, errors=,
+#                          compute_seconds=) }
+_stats: defaultdict[str, Counter] = defaultdict(Counter)
+_stats_since = datetime.now(timezone.utc)
+
+
+def set_backend(backend: CacheBackend) -> None:
+    """Replace the cache backend (e.g. in tests). Does not close the old one."""
+    global _backend
+    _backend = backend
+
+
+# Argument types that are already hashable and compare by value
+_SCALARS = frozenset({str, int, float, bool, type(None), date, datetime})
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable, order-normalized form of one argument value."""
+    if type(value) in _SCALARS:
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        # Sorted, not a frozenset: set iteration order (and so the key's repr,
+        # which shared backends hash) depends on PYTHONHASHSEED
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _make_key(name: str, args: tuple, kwargs: dict) -> CacheKey:
+    """Cache key: a tuple of the function name and normalized arguments."""
+    return (
+        name,
+        tuple([a if type(a) in _SCALARS else _freeze(a) for a in args]),
+        tuple([
+            (k, v if type(v) in _SCALARS else _freeze(v))
+            for k, v in sorted(kwargs.items())
+        ]),
+    )
+
+
+# Response headers that are recomputed for every reply rather than stored
+_ENTITY_HEADERS = frozenset({b"content-length", b"content-type"})
+
+
+def _encode(result: Any) -> tuple[str, bytes, int, tuple[tuple[str, str], ...]]:
+    """
+    Render a handler result exactly as FastAPI's default JSONResponse would:
+    (media type, body, status code, other headers).
+    """
+    if isinstance(result, Response):
+        headers = tuple(
+            (k.decode("latin-1"), v.decode("latin-1"))
+            for k, v in result.raw_headers if k not in _ENTITY_HEADERS
+        )
+        return (
+            result.media_type or "application/octet-stream",
+            bytes(result.body),
+            result.status_code,
+            headers,
+        )
+    # Handlers build JSON-native values (see aligned_data._json_safe), so only
+    # the rare value json can't encode goes through jsonable_encoder
+    body = json.dumps(
+        result,
+        default=jsonable_encoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return "application/json", body, 200, ()
+
+
+def _compressible(media_type: str) -> bool:
+    """Text formats; binary ones (Arrow, Parquet, ...) are left as they are."""
+    media_type = media_type.partition(";")[0].strip().lower()
+    return media_type == "application/json" or media_type.startswith("text/")
+
+
+def _compress(media_type: str, body: bytes) -> tuple[bytes | None, bytes | None]:
+    """gzip / brotli variants of `body`, or None when not worth it."""
+    if len(body) < settings.CACHE_COMPRESS_MIN_BYTES or not _compressible(media_type):
+        return None, None
+    gz = gzip.compress(body, compresslevel=6)
+    br = brotli.compress(body, quality=5) if brotli is not None else None
+    return gz, br
 
 
-# { cache_key: (expires_at_unix, value) }
-_store: dict[str, tuple[float, Any]] = {}
-_lock = asyncio.Lock()
+def _accepts(accept_encoding: str) -> set[str]:
+    """Codings the client accepts — anything listed without `q=0`."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(coding.strip())
+    return accepted
 
 
-def _make_key(fn: Callable, args: tuple, kwargs: dict) -> str:
-    """Stable cache key from function name + serialised arguments."""
-    raw = json.dumps(
-        {"fn": fn.__qualname__, "args": args, "kwargs": kwargs},
-        default=str,
-        sort_keys=True,
+@functools.lru_cache(maxsize=4096)
+def _etag(key: CacheKey, version: str | None) -> str:
+    """
+    Opaque validator for the body of `key` at data `version`, rendered by
+    this deploy (unquoted). Memoized: it is computed on every request, hits
+    and 304s included.
+    """
+    return hashlib.sha256(repr((NAMESPACE, key, version)).encode()).hexdigest()[:32]
+
+
+def _validators(etag: str | None, last_modified: datetime | None) -> dict[str, str]:
+    """Vary / ETag / Last-Modified headers for a response (or a 304)."""
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        headers["ETag"] = f'"{etag}"'
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _matching_etag(if_none_match: str, etag: str) -> str | None:
+    """The entity-tag in `if_none_match` that matches `etag` in any encoding, or None."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return f'"{etag}"'
+        # If-None-Match uses the weak comparison: W/ prefixes are ignored
+        if candidate.removeprefix("W/").strip('"').partition("-")[0] == etag:
+            return candidate
+    return None
+
+
+def _not_modified(
+    request: Request, etag: str | None, last_modified: datetime | None
+) -> Response | None:
+    """A 304 response when the request's validators still match, else None."""
+    headers = _validators(etag, last_modified)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110)
+        matched = _matching_etag(if_none_match, etag) if etag is not None else None
+        if matched is None:
+            return None
+        headers["ETag"] = matched
+        return Response(status_code=304, headers=headers)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return None
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return None
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second resolution
+    if last_modified.replace(microsecond=0) > since:
+        return None
+    return Response(status_code=304, headers=headers)
+
+
+def _respond(
+    entry: CacheEntry,
+    request: Request | None,
+    etag: str | None = None,
+    last_modified: datetime | None = None,
+) -> Response:
+    """Build the raw response for `entry`, choosing the best accepted variant."""
+    headers = _validators(etag, last_modified)
+    body = entry.body
+    if request is not None and (entry.br or entry.gzip):
+        accepted = _accepts(request.headers.get("accept-encoding", ""))
+        coding = None
+        if entry.br and "br" in accepted:
+            body, coding = entry.br, "br"
+        elif entry.gzip and "gzip" in accepted:
+            body, coding = entry.gzip, "gzip"
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+            # Strong validators differ per representation
+            if etag is not None:
+                headers["ETag"] = f'"{etag}-{coding}"'
+    response = Response(
+        content=body, status_code=entry.status, media_type=entry.media_type, headers=headers
     )
-    return hashlib.sha256(raw.encode()).hexdigest()
+    # The handler's own headers; appended raw so repeated ones (Set-Cookie) survive
+    response.raw_headers.extend(
+        (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in entry.headers
+    )
+    return response
+
+
+def _with_request_param(fn: Callable, wrapper: Callable) -> None:
+    """
+    Expose a `Request` parameter on `wrapper` so FastAPI passes the request in
+    (needed for Accept-Encoding). It is removed again before calling `fn`.
+    """
+    sig = inspect.signature(fn)
+    params = [p for p in sig.parameters.values() if p.kind is not p.VAR_KEYWORD]
+    params.append(
+        inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    )
+    params += [p for p in sig.parameters.values() if p.kind is p.VAR_KEYWORD]
+    wrapper.__signature__ = sig.replace(parameters=params)
+
+
+async def _compute(
+    key: CacheKey,
+    version: str | None,
+    ttl: int,
+    stale_ttl: int,
+    fn: Callable,
+    args: tuple,
+    kwargs: dict,
+) -> CacheEntry:
+    """Run the wrapped handler once, encode its result and store it under `key`.
+
+    The entry is tagged with the version observed *before* computing, so data
+    that changes mid-computation is picked up by the next request.
+    """
+    counters = _stats[fn_name(key)]
+    started = time.perf_counter()
+    try:
+        result = await fn(*args, **kwargs)
+        media_type, body, status, headers = _encode(result)
+        # zlib / brotli release the GIL — keep large compressions off the loop
+        if any(k.lower() == "content-encoding" for k, _ in headers):
+            gz, br = None, None  # the handler already encoded the body itself
+        else:
+            gz, br = await asyncio.to_thread(_compress, media_type, body)
+        counters["compute_seconds"] += time.perf_counter() - started
+        counters["computes"] += 1
+        expires_at = time.time() + ttl
+        entry = CacheEntry(
+            expires_at, expires_at + stale_ttl, version, media_type, body, gz, br, status, headers
+        )
+        await _backend.set(key, entry)
+        return entry
+    except BaseException:
+        counters["errors"] += 1
+        raise
+    finally:
+        _inflight.pop((key, version), None)
 
 
-def cached(ttl: int = 60):
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    """Done-callback for background refreshes nobody awaits."""
+    if not task.cancelled() and task.exception() is not None:
+        log.warning("cache refresh failed: %r", task.exception())
+
+
+def cached(
+    ttl: int = 60,
+    stale_ttl: int = 0,
+    version: Callable[..., str | None] | None = None,
+    bypass: Callable[..., bool] | None = None,
+):
     """
-    Decorator that caches the return value of an async function for `ttl` seconds.
+    Decorator that caches the encoded response of an async route handler for
+    `ttl` seconds. The wrapped handler always returns a raw `Response`.
 
     Args:
-        ttl: Time-to-live in seconds. Default 60 s.
+        ttl:       Time-to-live in seconds. Default 60 s.
+        stale_ttl: Extra seconds an expired entry may still be served while one
+                   background task refreshes it. Default 0 (disabled).
+        version:   Optional callable receiving the handler's arguments and
+                   returning the current data version. Entries tagged with a
+                   different version are never served, stale or not. It may
+                   instead return `(version, last_modified)` — when the data
+                   last changed, as an aware datetime or None — to also send
+                   `Last-Modified` and answer `If-Modified-Since`; and it may
+                   be async, e.g. to check many files off the event loop.
+        bypass:    Optional callable receiving the handler's arguments; when it
+                   returns True the handler runs uncached and its response is
+                   returned as is (e.g. a StreamingResponse, which has no body
+                   to store). Conditional requests are still answered.
     """
     def decorator(fn: Callable):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
         @functools.wraps(fn)
         async def wrapper(*args, **kwargs):
-            key = _make_key(fn, args, kwargs)
-            now = time.monotonic()
+            request = kwargs.pop(_REQUEST_PARAM, None)
+            counters = _stats[name]
+            key = _make_key(name, args, kwargs)
+            current = version(*args, **kwargs) if version else None
+            if inspect.isawaitable(current):
+                current = await current
+            modified = None
+            if isinstance(current, tuple):
+                current, modified = current
+            etag = _etag(key, current) if version else None
+
+            # Unchanged since the client's copy: no lookup, no computation
+            if request is not None and (etag is not None or modified is not None):
+                response = _not_modified(request, etag, modified)
+                if response is not None:
+                    counters["not_modified"] += 1
+                    return response
+
+            if bypass is not None and bypass(*args, **kwargs):
+                counters["bypassed"] += 1
+                response = await fn(*args, **kwargs)
+                if isinstance(response, Response):
+                    response.headers.update(_validators(etag, modified))
+                return response
 
-            async with _lock:
-                entry = _store.get(key)
-                if entry and entry[0] > now:
-                    return entry[1]
+            flight = (key, current)
+            now = time.time()
 
-            result = await fn(*args, **kwargs)
+            # No lock: the backend is safe to call concurrently, and each
+            # check-then-insert on `_inflight` below runs without an await in
+            # between, so it is atomic on the event loop.
+            entry = await _backend.get(key)
+            if entry and entry.stale_until > now and entry.version == current:
+                if entry.expires_at > now:
+                    counters["hits"] += 1
+                else:
+                    counters["stale_hits"] += 1
+                if entry.expires_at <= now and flight not in _inflight:
+                    # Stale: serve it now, refresh once in the background
+                    task = asyncio.ensure_future(
+                        _compute(key, current, ttl, stale_ttl, fn, args, kwargs)
+                    )
+                    task.add_done_callback(_log_refresh_failure)
+                    _inflight[flight] = task
+                return _respond(entry, request, etag, modified)
 
-            async with _lock:
-                _store[key] = (now + ttl, result)
+            # Join the computation already running for this key, or start it.
+            # The per-key task is the only serialization point: unrelated keys
+            # never wait on each other.
+            task = _inflight.get(flight)
+            if task is None:
+                counters["misses"] += 1
+                task = asyncio.ensure_future(
+                    _compute(key, current, ttl, stale_ttl, fn, args, kwargs)
+                )
+                _inflight[flight] = task
+            else:
+                counters["inflight_waits"] += 1
 
-            return result
+            # shield: one caller disconnecting must not cancel the shared task
+            return _respond(await asyncio.shield(task), request, etag, modified)
+
+        _with_request_param(fn, wrapper)
         return wrapper
     return decorator
 
 
-def invalidate_all() -> None:
+async def sweep_expired() -> int:
+    """Drop every entry past its stale window. Returns the number removed."""
+    return await _backend.sweep(time.time())
+
+
+async def _sweep_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await sweep_expired()
+        except Exception as e:
+            log.warning("cache sweep failed: %r", e)
+
+
+def start_sweeper() -> None:
+    """Start the background expiry sweeper (call from the app lifespan)."""
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.get_running_loop().create_task(
+            _sweep_loop(settings.CACHE_SWEEP_INTERVAL)
+        )
+
+
+async def stop_sweeper() -> None:
+    """Cancel the background sweeper, if running."""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
+
+
+async def close_backend() -> None:
+    """Release backend connections (call from the app lifespan on shutdown)."""
+    await _backend.close()
+
+
+async def invalidate_all() -> None:
     """Clear the entire cache (useful in tests)."""
-    _store.clear()
+    await _backend.clear()
+
+
+async def stats() -> dict:
+    """Per-function cache counters for this worker, plus what the backend holds."""
+    usage = await _backend.usage()
+    names = set(_stats) | set(usage) | set(_backend.evictions) | set(_backend.expired)
+    functions = {}
+    for name in sorted(names):
+        c = _stats.get(name, Counter())
+        held = usage.get(name, {})
+        served = c["hits"] + c["stale_hits"]
+        lookups = served + c["misses"] + c["inflight_waits"]
+        functions[name] = {
+            "hits":            c["hits"],
+            "stale_hits":      c["stale_hits"],
+            "misses":          c["misses"],
+            "inflight_waits":  c["inflight_waits"],
+            "bypassed":        c["bypassed"],
+            "not_modified":    c["not_modified"],
+            "computes":        c["computes"],
+            "errors":          c["errors"],
+            "evictions":       _backend.evictions[name],
+            "expired":         _backend.expired[name],
+            "entries":         held.get("entries", 0),
+            "bytes_held":      held.get("bytes", 0),
+            "compute_seconds": round(c["compute_seconds"], 6),
+            "avg_compute_ms":  (
+                round(1000 * c["compute_seconds"] / c["computes"], 3) if c["computes"] else None
+            ),
+            "hit_ratio":       round(served / lookups, 4) if lookups else None,
+        }
+    return {
+        "backend":   type(_backend).__name__,
+        "shared":    _backend.shared,
+        "pid":       os.getpid(),
+        "since":     _stats_since.isoformat(),
+        "functions": functions,
+    }
+
+
+def reset_stats() -> None:
+    """Zero every counter (cached entries are kept)."""
+    global _stats_since
+    _stats.clear()
+    _backend.reset_counters()
+    _stats_since = datetime.now(timezone.utc)
@@ -0,0 +1,388 @@
+"""
+app/core/cache_backends.py
+
+Storage backends for the API response cache (see app/core/cache.py).
+
+    memory — per-process OrderedDict with LRU eviction (default)
+    sqlite — one SQLite file in WAL mode, shared by every uvicorn worker on the host
+    redis  — any Redis-protocol server (Redis, Valkey, KeyDB, ...), shared across hosts
+
+Every backend stores the final encoded response body (plus optional gzip /
+brotli variants) with its status code and headers, so any worker can serve an
+entry another worker computed. Timestamps are wall-clock (`time.time()`) so
+they mean the same thing in every process. Shared keys are scoped to the
+deploy (`NAMESPACE`), so bodies rendered by an older release are not served.
+
+Select one with `CACHE_BACKEND` in app/core/config.py.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Hashable, NamedTuple
+
+from app.core.config import settings
+
+# Project root — relative CACHE_SQLITE_PATH values are resolved against it
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+# Cache keys are plain hashable tuples whose first element is the cached
+# function's name (see cache._make_key); only backends that store outside this
+# process turn them into strings.
+CacheKey = Hashable
+
+
+def fn_name(key: CacheKey) -> str:
+    """Name of the cached function a key belongs to (for per-function stats)."""
+    return key[0] if isinstance(key, tuple) and key else ""
+
+
+# Deploy namespace of shared stores: entries written by another app version
+# or build are never looked up again, and age out like any expired entry
+NAMESPACE = f"{settings.VERSION}+{settings.BUILD_ID}" if settings.BUILD_ID else settings.VERSION
+
+
+def external_key(key: CacheKey) -> str:
+    """Stable string form of `key` for stores shared with other processes (and deploys)."""
+    return hashlib.sha256(repr((NAMESPACE, key)).encode()).hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    expires_at: float    # wall-clock time after which the entry is stale
+    stale_until: float   # wall-clock time after which the entry is dropped
+    version: str | None  # data version the body was computed from
+    media_type: str
+    body: bytes          # encoded response body, uncompressed
+    gzip: bytes | None = None
+    br: bytes | None = None
+    status: int = 200    # status code of the handler's response
+    headers: tuple[tuple[str, str], ...] = ()  # its other headers, e.g. Content-Disposition
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the body and its compressed variants."""
+        return len(self.body) + len(self.gzip or b"") + len(self.br or b"")
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface every cache backend implements. Methods may be called
+    concurrently from many requests; callers take no lock around them.
+    """
+
+    #: True when entries are visible to other worker processes
+    shared: bool = False
+
+    def __init__(self):
+        # Entries this process removed, per function: over budget / past stale window
+        self.evictions: Counter[str] = Counter()
+        self.expired: Counter[str] = Counter()
+
+    @abc.abstractmethod
+    async def get(self, key: CacheKey) -> CacheEntry | None:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def sweep(self, now: float) -> int:
+        """Drop entries past their stale window. Returns the number removed."""
+        ...
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+    async def usage(self) -> dict[str, dict[str, int]]:
+        """{ function name: {"entries": n, "bytes": n} } for entries held now."""
+        return {}
+
+    def reset_counters(self) -> None:
+        self.evictions.clear()
+        self.expired.clear()
+
+
+# In-process
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process LRU store, bounded by entry count and by `max_bytes` of
+    held bodies. No method awaits anything, so each one runs to completion
+    on the event loop and needs no lock.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # { cache_key: CacheEntry } — least recently used first
+        self._store: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._bytes = 0
+
+    def _evict(self, key: CacheKey) -> CacheEntry | None:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    async def get(self, key: CacheKey) -> CacheEntry | None:
+        entry = self._store.get(key)
+        if entry is not None:
+            self._store.move_to_end(key)
+        return entry
+
+    async def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        self._evict(key)
+        self._store[key] = entry
+        self._bytes += entry.size
+        while self._store and (
+            len(self._store) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._store))
+            self._evict(oldest)
+            self.evictions[fn_name(oldest)] += 1
+
+    async def sweep(self, now: float) -> int:
+        expired = [k for k, e in self._store.items() if e.stale_until <= now]
+        for key in expired:
+            self._evict(key)
+            self.expired[fn_name(key)] += 1
+        return len(expired)
+
+    async def clear(self) -> None:
+        self._store.clear()
+        self._bytes = 0
+
+    async def usage(self) -> dict[str, dict[str, int]]:
+        out: dict[str, dict[str, int]] = {}
+        for key, entry in self._store.items():
+            u = out.setdefault(fn_name(key), {"entries": 0, "bytes": 0})
+            u["entries"] += 1
+            u["bytes"] += entry.size
+        return out
+
+
+# Shared: SQLite (single host)
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache table in a local SQLite file, opened in WAL mode so readers in every
+    worker proceed while one writer commits. Queries run in a worker thread
+    with one connection per thread. Over budget, the oldest writes go first.
+    """
+
+    shared = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS api_responses (
+            key         TEXT PRIMARY KEY,
+            fn          TEXT NOT NULL,
+            expires_at  REAL NOT NULL,
+            stale_until REAL NOT NULL,
+            version     TEXT,
+            media_type  TEXT NOT NULL,
+            body        BLOB NOT NULL,
+            gzip        BLOB,
+            br          BLOB,
+            status      INTEGER NOT NULL,
+            headers     TEXT NOT NULL,
+            size        INTEGER NOT NULL,
+            stored_at   REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str | Path, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(self._SCHEMA)
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _get(self, key: CacheKey) -> CacheEntry | None:
+        row = self._conn().execute(
+            "SELECT expires_at, stale_until, version, media_type, body, gzip, br, status, headers "
+            "FROM api_responses WHERE key = ?",
+            (external_key(key),),
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(*row[:-1], tuple(map(tuple, json.loads(row[-1]))))
+
+    def _set(self, key: CacheKey, entry: CacheEntry) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO api_responses "
+            "(key, fn, expires_at, stale_until, version, media_type, body, gzip, br, "
+            "status, headers, size, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (external_key(key), fn_name(key), *entry[:-1], json.dumps(entry.headers),
+             entry.size, time.time()),
+        )
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM api_responses"
+        ).fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            row = conn.execute(
+                "SELECT key, fn, size FROM api_responses ORDER BY stored_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM api_responses WHERE key = ?", (row[0],))
+            self.evictions[row[1]] += 1
+            count, total = count - 1, total - row[2]
+
+    def _sweep(self, now: float) -> int:
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT fn, COUNT(*) FROM api_responses WHERE stale_until <= ? GROUP BY fn",
+            (now,),
+        ).fetchall()
+        conn.execute("DELETE FROM api_responses WHERE stale_until <= ?", (now,))
+        for fn, n in rows:
+            self.expired[fn] += n
+        return sum(n for _, n in rows)
+
+    def _clear(self) -> None:
+        self._conn().execute("DELETE FROM api_responses")
+
+    def _usage(self) -> dict[str, dict[str, int]]:
+        rows = self._conn().execute(
+            "SELECT fn, COUNT(*), SUM(size) FROM api_responses GROUP BY fn"
+        ).fetchall()
+        return {fn: {"entries": n, "bytes": size} for fn, n, size in rows}
+
+    async def get(self, key: CacheKey) -> CacheEntry | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    async def sweep(self, now: float) -> int:
+        return await asyncio.to_thread(self._sweep, now)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    async def usage(self) -> dict[str, dict[str, int]]:
+        return await asyncio.to_thread(self._usage)
+
+    async def close(self) -> None:
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+
+# Shared: Redis protocol (multi host)
+
+class RedisBackend(CacheBackend):
+    """
+    One Redis hash per entry. Redis expires keys itself at the end of the
+    stale window, and its own maxmemory policy bounds the total size.
+    Requires the optional `redis` package (redis>=5, asyncio client).
+    Per-function usage is not tracked (it would need a scan of the keyspace).
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "mbt:cache:"):
+        super().__init__()
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the redis package: pip install redis"
+            ) from e
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: CacheKey) -> CacheEntry | None:
+        data = await self._redis.hgetall(self.prefix + external_key(key))
+        if not data:
+            return None
+        version = data.get(b"version") or None
+        return CacheEntry(
+            float(data[b"expires_at"]),
+            float(data[b"stale_until"]),
+            version.decode() if version else None,
+            data[b"media_type"].decode(),
+            data[b"body"],
+            data.get(b"gzip") or None,
+            data.get(b"br") or None,
+            int(data.get(b"status") or 200),
+            tuple(map(tuple, json.loads(data.get(b"headers") or b"[]"))),
+        )
+
+    async def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        ttl_ms = max(1, int((entry.stale_until - time.time()) * 1000))
+        name = self.prefix + external_key(key)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(name, mapping={
+                "expires_at":  repr(entry.expires_at),
+                "stale_until": repr(entry.stale_until),
+                "version":     entry.version or "",
+                "media_type":  entry.media_type,
+                "body":        entry.body,
+                "gzip":        entry.gzip or b"",
+                "br":          entry.br or b"",
+                "status":      entry.status,
+                "headers":     json.dumps(entry.headers),
+            })
+            pipe.pexpire(name, ttl_ms)
+            await pipe.execute()
+
+    async def sweep(self, now: float) -> int:
+        return 0  # Redis drops expired keys on its own
+
+    async def clear(self) -> None:
+        async for k in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(k)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def make_backend() -> CacheBackend:
+    """Build the backend selected by `settings.CACHE_BACKEND`."""
+    kind = settings.CACHE_BACKEND.lower()
+    if kind == "memory":
+        return MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+    if kind == "sqlite":
+        path = Path(settings.CACHE_SQLITE_PATH)
+        if not path.is_absolute():
+            path = ROOT / path
+        return SQLiteBackend(path, settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+    if kind == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL)
+    raise ValueError(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r} (memory, sqlite or redis)")
@@ -10,6 +10,10 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     APP_NAME: str = "Mini Bloomberg Terminal"
     VERSION: str = "1.0.0"
+    # Deploy identifier (e.g. the git commit). Keys in shared cache stores and
+    # ETags are scoped to VERSION + BUILD_ID, so a deploy never serves (or
+    # answers 304 for) bodies rendered by the previous code
+    BUILD_ID: str = ""
 
     # FastAPI
     DEBUG: bool = False
@@ -26,6 +30,17 @@ class Settings(BaseSettings):
     # OpenBB / data provider
     DEFAULT_PROVIDER: str = "yfinance"
 
+    # API response cache (app/core/cache.py)
+    CACHE_BACKEND: str = "memory"              # memory | sqlite | redis
+    CACHE_SQLITE_PATH: str = "data/cache/api_cache.sqlite3"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024   # encoded bodies + compressed variants
+    CACHE_COMPRESS_MIN_BYTES: int = 1024       # smaller bodies are not pre-compressed
+    CACHE_SWEEP_INTERVAL: float = 60.0         # seconds between expired-entry sweeps
+    CACHE_WARMUP: bool = True                  # precompute default views on startup
+    CACHE_WARMUP_CONCURRENCY: int = 4
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
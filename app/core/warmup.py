@@ -0,0 +1,77 @@
+"""
+app/core/warmup.py
+
+Startup cache warm-up.
+
+Right after a deploy every ticker's first request pays the full cold
+alignment. `warm_cache` precomputes the default views the dashboard asks for
+first — `GET /api/v1/data/{ticker}` (last 365 days, daily, all datasets) and
+`GET /api/v1/data/{ticker}/summary` — for the default watchlist plus every
+ticker with processed data on disk.
+
+It runs as a background task from the app lifespan, at most
+`CACHE_WARMUP_CONCURRENCY` tickers at a time, so the server starts accepting
+requests immediately.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.core.config import settings
+from ingestion.core.config import DEFAULT_TICKERS
+from ingestion.core.utils import get_logger
+
+log = get_logger("cache_warmup")
+
+
+def warmup_tickers() -> list[str]:
+    """DEFAULT_TICKERS first, then any other ticker found in data/processed."""
+    from app.routers.aligned_data import available_tickers
+
+    tickers = list(DEFAULT_TICKERS)
+    tickers += [t for t in available_tickers() if t not in tickers]
+    return tickers
+
+
+async def _warm_ticker(ticker: str) -> None:
+    from app.routers.aligned_data import get_aligned_data, get_data_summary
+
+    # Arguments exactly as FastAPI passes them for a request with no query
+    # string, so the warmed entries have the same cache keys.
+    await get_aligned_data(
+        ticker=ticker,
+        start=None,
+        end=None,
+        mode="daily",
+        calendar="daily",
+        include="prices,financials,filings,news,executives",
+        format="rows",
+    )
+    await get_data_summary(ticker=ticker)
+
+
+async def warm_cache(tickers: list[str] | None = None, concurrency: int | None = None) -> None:
+    """Populate the response cache for `tickers` (default: `warmup_tickers()`)."""
+    tickers = tickers if tickers is not None else warmup_tickers()
+    concurrency = concurrency or settings.CACHE_WARMUP_CONCURRENCY
+    limit = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    done = 0
+
+    async def warm(ticker: str) -> None:
+        nonlocal done
+        async with limit:
+            t0 = time.perf_counter()
+            try:
+                await _warm_ticker(ticker)
+            except Exception as e:
+                log.warning(f"[{ticker}] warm-up failed: {e}")
+                return
+            finally:
+                done += 1
+            log.info(f"[{ticker}] warmed in {time.perf_counter() - t0:.2f}s ({done}/{len(tickers)})")
+
+    log.info(f"cache warm-up: {len(tickers)} tickers, concurrency {concurrency}")
+    await asyncio.gather(*(warm(t) for t in tickers))
+    log.info(f"cache warm-up finished in {time.perf_counter() - started:.2f}s")
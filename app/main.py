@@ -3,6 +3,7 @@ OpenBB Terminal Backend — Main FastAPI Application
 Bloomberg-alternative data platform
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -10,15 +11,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import date
 from typing import Optional
 from fastapi import Query
+from app.core.cache import close_backend, start_sweeper, stop_sweeper
 from app.core.config import settings
-from app.routers import aligned_data
+from app.core.warmup import warm_cache
+from app.routers import aligned_data, cache_stats
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     print(f"Starting {settings.APP_NAME} v{settings.VERSION}")
     print(f"OpenBB provider: {settings.DEFAULT_PROVIDER}")
+    start_sweeper()
+    warmup = asyncio.create_task(warm_cache()) if settings.CACHE_WARMUP else None
     yield
+    if warmup is not None:
+        warmup.cancel()
+    await stop_sweeper()
+    await close_backend()
     print("Shutting down...")
 
 
@@ -38,10 +47,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],  # so polling clients can revalidate
 )
 
 # Routers
 app.include_router(aligned_data.router, prefix="/api/v1/data", tags=["Aligned Data"])
+app.include_router(cache_stats.router, prefix="/api/v1/cache", tags=["Cache"])
 
 
 @app.get("/")
@@ -12,11 +12,13 @@ ready to directly populate the UI.
 #from __future__ import annotations
 
 import sys
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 
 # Allow importing ingestion layer from project root
 ROOT = Path(__file__).resolve().parent.parent.parent
@@ -42,7 +44,9 @@ COL_PREFIXES: dict[str, list[str]] = {
 }
 
 # Explicit full-column overrides (for columns that don't follow a clean prefix)
-COL_EXPLICIT: dict[str, str] = {}  # add overrides here if needed
+COL_EXPLICIT: dict[str, str] = {  # add overrides here if needed
+    "accession_number": "filings",
+}
 
 
 def _dataset_for_col(col: str) -> str:
@@ -55,6 +59,42 @@ def _dataset_for_col(col: str) -> str:
     return "other"
 
 
+def _symbol(ticker: str) -> str:
+    """
+    `ticker` upper-cased, or a 400 unless it is a plain symbol — tickers end
+    up in file paths.
+    """
+    from ingestion.core.alignment import TICKER_RE
+
+    symbol = ticker.upper()
+    if not TICKER_RE.fullmatch(symbol):
+        raise HTTPException(status_code=400, detail=f"invalid ticker {ticker!r}")
+    return symbol
+
+
+def _data_stamp(
+    ticker: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    **_,
+) -> tuple[str, Optional[datetime]]:
+    """
+    Cache version tag and Last-Modified for a response, from one stat of the
+    ticker's input files: their fingerprint and newest mtime. When the window
+    is relative to today (no explicit `end`), the tag also carries today's date
+    and Last-Modified is at least the start of today.
+    """
+    from ingestion.core.alignment import data_stamp
+
+    version, modified = data_stamp(_symbol(ticker))
+    if end is None:
+        today = date.today()
+        version += f"@{today.isoformat()}"
+        midnight = datetime.combine(today, datetime.min.time()).astimezone(timezone.utc)
+        modified = max(modified, midnight) if modified is not None else midnight
+    return version, modified
+
+
 def _col_type(series) -> str:
     import pandas as pd
     if pd.api.types.is_numeric_dtype(series):
@@ -62,6 +102,97 @@ def _col_type(series) -> str:
     return "string"
 
 
+def _json_safe(df):
+    """
+    `df` as an object frame of JSON-safe values, converted column-wise: NaN/NaT
+    become None and datetime columns ISO strings, as `_serialize` does per cell.
+    """
+    import pandas as pd
+
+    out = df.astype(object).where(df.notna(), None)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            out[col] = [None if v is None else v.isoformat() for v in out[col]]
+    return out
+
+
+def _records(df) -> list[dict]:
+    """Rows of `df` as JSON-safe dicts (index not included)."""
+    return _json_safe(df).to_dict("records")
+
+
+def _columnar(df) -> dict[str, list]:
+    """`{"date": [...], col: [...], ...}` — one JSON-safe list per column."""
+    out = _json_safe(df)
+    return {
+        "date": list(df.index.strftime("%Y-%m-%d")),
+        **{col: out[col].tolist() for col in df.columns},
+    }
+
+
+# Binary formats (optional pyarrow): format -> media type
+BINARY_FORMATS: dict[str, str] = {
+    "arrow":   "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _require_pyarrow(format: str) -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail=f"format={format} needs pyarrow on the server: pip install pyarrow",
+        )
+
+
+def _binary_response(df, format: str) -> Response:
+    """
+    `df` (index included) as an Arrow IPC stream or a Parquet file. Numeric
+    columns go to Arrow straight from their numpy buffers — no per-value
+    Python conversion as in the JSON formats.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    if format == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=BINARY_FORMATS[format])
+
+
+# Rows per chunk written by format=ndjson
+NDJSON_CHUNK_ROWS = 500
+
+
+def _ndjson_chunks(df):
+    """
+    One JSON object per line (`date` + columns), encoded `NDJSON_CHUNK_ROWS`
+    rows at a time so only one chunk of rows is ever held as Python objects.
+    """
+    import json
+    from fastapi.encoders import jsonable_encoder
+
+    for i in range(0, len(df), NDJSON_CHUNK_ROWS):
+        chunk = df.iloc[i:i + NDJSON_CHUNK_ROWS]
+        lines = [
+            json.dumps({"date": d, **r}, ensure_ascii=False, separators=(",", ":"),
+                       default=jsonable_encoder)
+            for d, r in zip(chunk.index.strftime("%Y-%m-%d"), _records(chunk))
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _streams(format: str = "rows", **_) -> bool:
+    """Streamed formats are served uncached (see `cached(bypass=...)`)."""
+    return format == "ndjson"
+
+
 def _serialize(val):
     """Make values JSON-safe."""
     import math
@@ -77,6 +208,142 @@ def _serialize(val):
     return val
 
 
+async def _batch_version(tickers: str, end: Optional[date] = None, **_) -> str:
+    """
+    Cache version tag for a batch: every ticker's version, joined. Up to 50
+    tickers' files are stat'ed, so it runs in the threadpool.
+    """
+    symbols = sorted({_symbol(t.strip()) for t in tickers.split(",") if t.strip()})
+    return await run_in_threadpool(
+        lambda: ",".join(_data_stamp(t, end=end)[0] for t in symbols)
+    )
+
+
+# Batch endpoint (declared before /{ticker} so "batch" isn't taken as a ticker)
+
+@router.get(
+    "/batch",
+    summary="Aligned data for several tickers in one response",
+    response_description="Long-format panel: one row per (date, ticker)",
+)
+@cached(ttl=6 * 3600, stale_ttl=600, version=_batch_version)
+async def get_aligned_batch(
+    tickers: str = Query(
+        ...,
+        description="Comma-separated tickers, e.g. AAPL,MSFT,NFLX (at most 50).",
+    ),
+    start: Optional[date] = Query(default=None, description="Start date (YYYY-MM-DD). Defaults to 1 year ago."),
+    end: Optional[date] = Query(default=None, description="End date (YYYY-MM-DD). Defaults to today."),
+    mode: str = Query(default="daily", description="Alignment mode: daily or sparse."),
+    calendar: str = Query(default="daily", description="Daily-mode index: daily or trading."),
+    include: str = Query(
+        default="prices,financials,filings,news,executives",
+        description="Comma-separated list of datasets to include.",
+    ),
+    format: str = Query(
+        default="rows",
+        description="rows (JSON, default), or arrow / parquet: the (date, ticker) table (needs pyarrow).",
+    ),
+):
+    """
+    Same alignment as `GET /{ticker}` for a whole watchlist in one request.
+    Tickers are aligned in parallel; rows are ordered by date, then by the
+    order of `tickers`, and each row carries a `ticker` key. In daily mode
+    every ticker has a row on every date of one shared calendar. Tickers without
+    ingested data are listed in `meta.tickers_missing`. `format=arrow` /
+    `format=parquet` return the panel as a table with `date` and `ticker`
+    columns instead.
+    """
+    if not end:
+        end = date.today()
+    if not start:
+        start = end - timedelta(days=365)
+
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    if mode not in ("daily", "sparse"):
+        raise HTTPException(status_code=400, detail="mode must be 'daily' or 'sparse'")
+
+    if calendar not in ("daily", "trading"):
+        raise HTTPException(status_code=400, detail="calendar must be 'daily' or 'trading'")
+    if calendar == "trading" and mode != "daily":
+        raise HTTPException(status_code=400, detail="calendar=trading requires mode=daily")
+
+    if format not in ("rows", *BINARY_FORMATS):
+        raise HTTPException(status_code=400, detail="format must be 'rows', 'arrow' or 'parquet'")
+    if format in BINARY_FORMATS:
+        _require_pyarrow(format)
+
+    symbols = list(dict.fromkeys(_symbol(t.strip()) for t in tickers.split(",") if t.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="tickers must list at least one ticker")
+    if len(symbols) > 50:
+        raise HTTPException(status_code=400, detail="at most 50 tickers per batch")
+
+    requested_datasets = {d.strip() for d in include.split(",")}
+    load_datasets = [d for d in COL_PREFIXES if d in requested_datasets] or None
+
+    try:
+        from ingestion.core.alignment import align_many
+
+        df = await run_in_threadpool(align_many, symbols, start, end, load_datasets, mode, calendar)
+
+        keep_cols = [
+            col for col in df.columns
+            if _dataset_for_col(col) in requested_datasets
+            or _dataset_for_col(col) == "other"
+        ]
+        if keep_cols:
+            df = df[keep_cols]
+
+        if format in BINARY_FORMATS:
+            return await run_in_threadpool(_binary_response, df, format)
+
+        columns_meta = [
+            {
+                "key":      col,
+                "label":    col.replace("_", " ").title(),
+                "dataset":  _dataset_for_col(col),
+                "type":     _col_type(df[col]),
+                "nullable": bool(df[col].isna().any()),
+            }
+            for col in df.columns
+        ]
+
+        rows = [
+            {"date": d, "ticker": t, **r}
+            for d, t, r in zip(
+                df.index.get_level_values("date").strftime("%Y-%m-%d"),
+                df.index.get_level_values("ticker"),
+                _records(df),
+            )
+        ] if len(df) else []
+        present = set(df.index.get_level_values("ticker")) if len(df) else set()
+
+        return {
+            "success":   True,
+            "tickers":   symbols,
+            "start":     str(start),
+            "end":       str(end),
+            "mode":      mode,
+            "row_count": len(rows),
+            "columns":   columns_meta,
+            "rows":      rows,
+            "meta": {
+                "datasets_requested": sorted(requested_datasets),
+                "tickers_missing":    [t for t in symbols if t not in present],
+                "note": (
+                    "Null values mean no data existed at or before that date. "
+                    "No values are fabricated."
+                ),
+            },
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Main endpoint
 
 @router.get(
@@ -84,7 +351,11 @@ def _serialize(val):
     summary="Aligned multi-pipeline data for a date range",
     response_description="Unified timeline with prices, financials, filings, news, and exec data",
 )
-@cached(ttl=120)  # cache each (ticker, start, end, mode, include) for 2 minutes
+# Long TTL: entries are invalidated as soon as the ticker's ingestion outputs change
+@cached(
+    ttl=6 * 3600, stale_ttl=600,
+    version=_data_stamp, bypass=_streams,
+)
 async def get_aligned_data(
     ticker: str,
     start: Optional[date] = Query(
@@ -103,10 +374,29 @@ async def get_aligned_data(
             "  sparse — one row per sparse reference point (executives/filings dates only)"
         ),
     ),
+    calendar: str = Query(
+        default="daily",
+        description=(
+            "Daily-mode index:\n"
+            "  daily   — every calendar day (default)\n"
+            "  trading — price sessions only; news/filings on other days roll to the next session"
+        ),
+    ),
     include: str = Query(
         default="prices,financials,filings,news,executives",
         description="Comma-separated list of datasets to include.",
     ),
+    format: str = Query(
+        default="rows",
+        description=(
+            "Response layout:\n"
+            "  rows     — `rows`: one object per date (default)\n"
+            "  columnar — `data`: {\"date\": [...], column: [...]}, one array per column\n"
+            "  arrow    — Arrow IPC stream of the aligned table (needs pyarrow)\n"
+            "  parquet  — Parquet file of the aligned table (needs pyarrow)\n"
+            "  ndjson   — streamed, one row object per line (not cached)"
+        ),
+    ),
 ):
     """
     Returns timestamp-aligned data across all ingestion pipelines for a ticker.
@@ -121,6 +411,12 @@ async def get_aligned_data(
     **Frontend usage:**
     The response `rows` array can be mapped directly to chart data or table rows.
     Each row has a `date` key plus one key per available data column.
+    With `format=columnar`, `data` holds one array per column instead (no
+    repeated keys), which chart libraries can consume directly. `format=arrow`
+    and `format=parquet` return just the aligned table (a `date` column plus
+    the data columns), for notebooks and backtests. `format=ndjson` streams
+    the rows, one JSON object per line, as they are encoded — for long ranges
+    where clients should start rendering before the last row is ready.
     Null values mean no data exists at or before that date for that field.
     """
     #  Defaults 
@@ -135,21 +431,39 @@ async def get_aligned_data(
     if mode not in ("daily", "sparse"):
         raise HTTPException(status_code=400, detail="mode must be 'daily' or 'sparse'")
 
-    ticker = ticker.upper()
+    if calendar not in ("daily", "trading"):
+        raise HTTPException(status_code=400, detail="calendar must be 'daily' or 'trading'")
+    if calendar == "trading" and mode != "daily":
+        raise HTTPException(status_code=400, detail="calendar=trading requires mode=daily")
+
+    if format not in ("rows", "columnar", "ndjson", *BINARY_FORMATS):
+        raise HTTPException(
+            status_code=400,
+            detail="format must be 'rows', 'columnar', 'ndjson', 'arrow' or 'parquet'",
+        )
+    if format in BINARY_FORMATS:
+        _require_pyarrow(format)
+
+    ticker = _symbol(ticker)
     requested_datasets = {d.strip() for d in include.split(",")}
+    # Only known datasets are loaded; if none are recognised, load everything
+    load_datasets = [d for d in COL_PREFIXES if d in requested_datasets] or None
 
     try:
-        from ingestion.core.alignment import align, align_to_sparse_ref
+        from ingestion.core.alignment import align_window, last_modified
 
-        df = align_to_sparse_ref(ticker, start, end) if mode == "sparse" else align(ticker, start, end)
+        # Slice of the ticker's materialized timeline (built once per data
+        # version). Blocking pandas work — keep it off the event loop
+        df = await run_in_threadpool(align_window, ticker, start, end, load_datasets, mode, calendar)
         import pandas as pd
 
         # Ensure datetime index (drop any rows that can't be parsed as dates)
         df = df.copy()
         df.index = pd.to_datetime(df.index, errors="coerce")
         df = df[~df.index.isna()]
+        df.index.name = "date"
 
-        if df.empty:
+        if df.empty and format in ("rows", "columnar"):
             return {
                 "success":   True,
                 "ticker":    ticker,
@@ -158,10 +472,14 @@ async def get_aligned_data(
                 "mode":      mode,
                 "row_count": 0,
                 "columns":   [],
-                "rows":      [],
+                **({"data": {"date": []}} if format == "columnar" else {"rows": []}),
                 "meta": {
                     "message": "No ingested data found. Run the ingestion layer first.",
                     "hint":    f"python -m ingestion.run_ingestion --ticker {ticker}",
+                } if last_modified(ticker) is None else {
+                    # Ingested, but the requested datasets have nothing in range
+                    "message":            "No data in range for the requested datasets.",
+                    "datasets_requested": sorted(requested_datasets),
                 },
             }
 
@@ -175,6 +493,12 @@ async def get_aligned_data(
         if keep_cols:
             df = df[keep_cols]
 
+        if format in BINARY_FORMATS:
+            return await run_in_threadpool(_binary_response, df, format)
+        if format == "ndjson":
+            # Sync generator: Starlette iterates it in the threadpool
+            return StreamingResponse(_ndjson_chunks(df), media_type="application/x-ndjson")
+
         # Build column metadata for the frontend
         columns_meta = [
             {
@@ -202,14 +526,14 @@ async def get_aligned_data(
             if prev is None or first_date < prev:
                 data_start[ds] = first_date
             
-        # Serialize rows 
-        rows = [
-            {
-                "date": idx.date().isoformat() if hasattr(idx, "date") else str(idx),
-                **{col: _serialize(row[col]) for col in df.columns}
-            }
-            for idx, row in df.iterrows()
-        ]
+        # Serialize column-wise (one vectorized pass per column, not per cell)
+        if format == "columnar":
+            body = {"data": _columnar(df)}
+        else:
+            body = {"rows": [
+                {"date": d, **r}
+                for d, r in zip(df.index.strftime("%Y-%m-%d"), _records(df))
+            ]}
 
         return {
             "success":   True,
@@ -217,14 +541,16 @@ async def get_aligned_data(
             "start":     str(start),
             "end":       str(end),
             "mode":      mode,
-            "row_count": len(rows),
+            "row_count": len(df),
             "columns":   columns_meta,
-            "rows":      rows,
+            **body,
             "meta": {
                 "alignment_strategy": (
-                    "daily calendar index with forward-fill"
-                    if mode == "daily"
-                    else "sparse reference clock (sparsest available dataset)"
+                    "sparse reference clock (sparsest available dataset)"
+                    if mode == "sparse"
+                    else "trading-session index with forward-fill"
+                    if calendar == "trading"
+                    else "daily calendar index with forward-fill"
                 ),
                 "datasets_requested": sorted(requested_datasets),
                 "datasets_present":   sorted({_dataset_for_col(c) for c in df.columns} - {"other"}),
@@ -254,21 +580,22 @@ async def get_aligned_data(
     "/{ticker}/summary",
     summary="Summary snapshot — latest values per dataset",
 )
-@cached(ttl=300)  # 5 minutes — summary is cheap to cache longer
+@cached(ttl=6 * 3600, stale_ttl=900, version=_data_stamp)
 async def get_data_summary(ticker: str):
     """
     Returns the latest available value for each dataset column —
     no date range needed. Good for a company overview card.
     """
+    ticker = _symbol(ticker)
     try:
-        from ingestion.core.alignment import align
+        from ingestion.core.alignment import align_window
 
         end = date.today()
         start = end - timedelta(days=365)
-        df = align(ticker.upper(), start, end)
+        df = await run_in_threadpool(align_window, ticker, start, end)
 
         if df.empty:
-            return {"success": True, "ticker": ticker.upper(), "data": {}}
+            return {"success": True, "ticker": ticker, "data": {}}
 
         summary = {}
         for col in df.columns:
@@ -282,7 +609,7 @@ async def get_data_summary(ticker: str):
 
         return {
             "success": True,
-            "ticker":  ticker.upper(),
+            "ticker":  ticker,
             "data":    summary,
         }
 
@@ -292,6 +619,20 @@ async def get_data_summary(ticker: str):
 
 # Available tickers endpoint
 
+def available_tickers() -> list[str]:
+    """Tickers with at least one pipeline output file in the processed dir."""
+    from ingestion.core.config import PROC_DIR
+    import re
+
+    files = list(PROC_DIR.glob("*.json")) + list(PROC_DIR.glob("*.csv"))
+    # Extract ticker from filenames like AAPL_p1_summary.json
+    return sorted({
+        re.match(r"^([A-Z]+)_", f.name).group(1)
+        for f in files
+        if re.match(r"^([A-Z]+)_", f.name)
+    })
+
+
 @router.get(
     "/",
     summary="List tickers with available processed data",
@@ -302,16 +643,7 @@ async def list_available_tickers():
     that have at least one pipeline output file.
     """
     try:
-        from ingestion.core.config import PROC_DIR
-        import re
-
-        files = list(PROC_DIR.glob("*.json")) + list(PROC_DIR.glob("*.csv"))
-        # Extract ticker from filenames like AAPL_p1_summary.json
-        tickers = sorted({
-            re.match(r"^([A-Z]+)_", f.name).group(1)
-            for f in files
-            if re.match(r"^([A-Z]+)_", f.name)
-        })
+        tickers = available_tickers()
         return {"success": True, "tickers": tickers, "count": len(tickers)}
 
     except Exception as e:
@@ -0,0 +1,44 @@
+"""
+app/routers/cache_stats.py
+
+Response cache observability.
+
+GET  /api/v1/cache/stats        — per-function hit/miss/eviction counters
+POST /api/v1/cache/stats/reset  — zero the counters (cached entries are kept)
+
+Counters are per worker process: with several uvicorn workers each one
+reports its own numbers (see `pid` in the response).
+"""
+
+from fastapi import APIRouter
+
+from app.core import cache
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Cache counters per cached endpoint",
+)
+async def get_cache_stats():
+    """
+    For each cached function: `hits`, `stale_hits` (served stale while
+    refreshing), `misses`, `inflight_waits` (joined a computation already
+    running), `bypassed` (requests the endpoint serves uncached, e.g.
+    streamed responses), `not_modified` (conditional requests answered
+    with 304), `computes` (misses plus background refreshes that completed),
+    `errors`, `evictions` (dropped over budget), `expired` (swept
+    after the stale window), `entries` / `bytes_held` currently stored, and
+    `compute_seconds` / `avg_compute_ms` spent producing misses.
+    """
+    return {"success": True, **(await cache.stats())}
+
+
+@router.post(
+    "/stats/reset",
+    summary="Reset cache counters",
+)
+async def reset_cache_stats():
+    cache.reset_stats()
+    return {"success": True, **(await cache.stats())}
@@ -0,0 +1,67 @@
+"""
+benchmarks/bench_cache_keys.py
+
+Micro-benchmark: cost of deriving a cache key and looking it up, per request,
+for the arguments `get_aligned_data` receives.
+
+    json+sha256  — previous key path: json.dumps(sort_keys=True) + SHA-256 hex
+    tuple        — current key path: normalized argument tuple, plain dict lookup
+    tuple+sha256 — tuple key hashed for a shared backend (SQLite / Redis)
+
+Usage:
+    python -m benchmarks.bench_cache_keys [--number 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import timeit
+from datetime import date
+
+from app.core.cache import _make_key
+from app.core.cache_backends import external_key
+
+NAME = "app.routers.aligned_data.get_aligned_data"
+KWARGS = {
+    "ticker":  "AAPL",
+    "start":   date(2024, 1, 1),
+    "end":     date(2024, 12, 31),
+    "mode":    "daily",
+    "include": "prices,financials,filings,news,executives",
+}
+
+
+def json_sha256_key(name: str, args: tuple, kwargs: dict) -> str:
+    """The key derivation the cache used before tuple keys."""
+    raw = json.dumps(
+        {"fn": name, "args": args, "kwargs": kwargs},
+        default=str,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--number", type=int, default=200_000)
+    n = parser.parse_args().number
+
+    store_json  = {json_sha256_key(NAME, (), KWARGS): 1}
+    store_tuple = {_make_key(NAME, (), KWARGS): 1}
+
+    cases = {
+        "json+sha256":  lambda: store_json.get(json_sha256_key(NAME, (), KWARGS)),
+        "tuple":        lambda: store_tuple.get(_make_key(NAME, (), KWARGS)),
+        "tuple+sha256": lambda: external_key(_make_key(NAME, (), KWARGS)),
+    }
+    base = None
+    print(f"{'key path':<14} {'µs/lookup':>10} {'speedup':>8}")
+    for label, stmt in cases.items():
+        best = min(timeit.repeat(stmt, number=n, repeat=5)) / n * 1e6
+        base = base or best
+        print(f"{label:<14} {best:>10.3f} {base / best:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+benchmarks/bench_load_news.py
+
+Benchmark: parsing a news / filings JSON file into the loader frame.
+
+    per-record  — previous loaders: one pd.to_datetime call per record
+    vectorized  — current loaders: one frame from the records, one
+                  pd.to_datetime call for the whole date column
+
+Runs against synthetic files written to a temporary directory, so no
+ingestion outputs are needed. Loader caching is bypassed (`__wrapped__`).
+
+Usage:
+    python -m benchmarks.bench_load_news [--articles 20000] [--filings 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from ingestion.core import alignment
+
+TICKER = "BENCH"
+
+
+def write_inputs(folder: Path, n_articles: int, n_filings: int) -> None:
+    rng = random.Random(0)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    articles = [
+        {
+            "published_at": (now - timedelta(seconds=rng.randrange(2 * 365 * 86400)))
+                            .strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "title":     f"Headline {i}",
+            "url":       f"https://example.com/news/{i}",
+            "publisher": rng.choice(["Reuters", "Bloomberg", "WSJ", "FT"]),
+        }
+        for i in range(n_articles)
+    ]
+    filings = [
+        {
+            "filed_date": (now - timedelta(days=i)).strftime("%Y-%m-%d"),
+            "form_type":  rng.choice(["10-K", "10-Q", "8-K"]),
+            "filing_url": f"https://example.com/filings/{i}",
+            "accession_number": f"0000000000-26-{i:06d}",
+        }
+        for i in range(n_filings)
+    ]
+    (folder / f"{TICKER}_p3_news.json").write_text(json.dumps({"articles": articles}))
+    (folder / f"{TICKER}_p2_filings.json").write_text(json.dumps({"filings": filings}))
+
+
+def news_per_record(folder: Path) -> pd.DataFrame:
+    """The news loader before vectorization."""
+    data = json.loads((folder / f"{TICKER}_p3_news.json").read_text())
+    rows = []
+    for a in data.get("articles", []):
+        d = a.get("published_at")
+        if d:
+            rows.append({
+                "date":          pd.to_datetime(d).normalize(),
+                "news_title":    a.get("title"),
+                "news_url":      a.get("url"),
+                "news_publisher":a.get("publisher"),
+            })
+    df = pd.DataFrame(rows).set_index("date")
+    return df[~df.index.duplicated(keep="last")]
+
+
+def filings_per_record(folder: Path) -> pd.DataFrame:
+    """The filings loader before vectorization."""
+    data = json.loads((folder / f"{TICKER}_p2_filings.json").read_text())
+    rows = []
+    for f in data.get("filings", []):
+        d = f.get("filed_date")
+        if d:
+            rows.append({
+                "date": pd.to_datetime(d, utc=True).tz_localize(None).normalize(),
+                "filing_type":      f.get("form_type"),
+                "filing_url":       f.get("filing_url"),
+                "accession_number": f.get("accession_number"),
+            })
+    df = pd.DataFrame(rows).set_index("date")
+    return df[~df.index.duplicated(keep="last")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--articles", type=int, default=20_000)
+    parser.add_argument("--filings", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        write_inputs(folder, args.articles, args.filings)
+        alignment.PROC_DIR = folder
+
+        cases = {
+            f"news ({args.articles})": (
+                lambda: news_per_record(folder),
+                lambda: alignment.load_news.__wrapped__(TICKER),
+            ),
+            f"filings ({args.filings})": (
+                lambda: filings_per_record(folder),
+                lambda: alignment.load_filings.__wrapped__(TICKER),
+            ),
+        }
+        print(f"{'input':<18} {'per-record ms':>14} {'vectorized ms':>14} {'speedup':>8}")
+        for label, (old, new) in cases.items():
+            # Same rows and values; the old news frame is tz-aware (UTC) until alignment drops the tz
+            expected = alignment._to_utc_naive_index(old())
+            pd.testing.assert_frame_equal(new(), expected, check_index_type=False, check_freq=False)
+            t_old = min(timeit.repeat(old, number=1, repeat=args.repeat)) * 1e3
+            t_new = min(timeit.repeat(new, number=1, repeat=args.repeat)) * 1e3
+            print(f"{label:<18} {t_old:>14.1f} {t_new:>14.1f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,30 +11,53 @@ Strategy:
 
 This produces a unified timeline per ticker where every date has consistent,
 non-hallucinated data across all pipeline outputs.
+
+Loaders keep their parsed, index-normalized frames in memory (the
+LOADER_CACHE_SIZE most recently used), keyed on the mtime and size of the
+files they read, so requests that only differ in date range reuse the parse.
+Frames returned by the loaders are shared — treat them as read-only.
+
+Loaders also accept a `start`/`end` window and return only the rows inside it,
+plus the nearest row on each side (so "last value before start" and range
+clipping still work). The window is sliced from the cached full parse.
 """
 
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import io
 import json
-from datetime import date, datetime, timedelta
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
+import numpy as np
 import pandas as pd
 
-from ingestion.core.config import PROC_DIR
+from ingestion.core.config import (
+    LOADER_CACHE_SIZE, PERSIST_TIMELINES, PROC_DIR, RAW_DIR, TIMELINE_CACHE_SIZE, TIMELINE_DIR,
+)
 from ingestion.core.utils import get_logger
 def _to_utc_naive_index(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure DatetimeIndex is timezone-naive (UTC) for safe comparisons/joins."""
     if df is None or df.empty:
         return df
+    # Already normalized (e.g. a cached loader frame): return it as-is, no copy
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is None and not df.index.hasnans:
+        return df
     idx = pd.to_datetime(df.index, errors="coerce")
     # If tz-aware, convert to UTC then drop tz; if tz-naive, leave as-is.
     if getattr(idx, "tz", None) is not None:
         idx = idx.tz_convert("UTC").tz_localize(None)
-    df = df.copy()
-    df.index = idx
+    df = df.set_axis(idx, axis=0)
     return df[~df.index.isna()]
 
 log = get_logger("alignment")
@@ -43,11 +66,149 @@ log = get_logger("alignment")
 SPARSITY_ORDER = ["executives", "filings", "financials", "news", "prices"]
 
 
+# Source files: everything the loaders below read, per dataset
+
+# Tickers become parts of file names, so only plain symbols are accepted
+# (upper-cased first): no path separators, no leading dot
+TICKER_RE = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+
+
+def _check_ticker(ticker: str) -> str:
+    """`ticker` upper-cased; ValueError unless it matches TICKER_RE."""
+    symbol = ticker.upper()
+    if not TICKER_RE.fullmatch(symbol):
+        raise ValueError(f"invalid ticker {ticker!r}")
+    return symbol
+
+
+def source_files(ticker: str) -> dict[str, list[Path]]:
+    """Input files read by each loader for `ticker` (existing or not)."""
+    return {
+        "prices":     [RAW_DIR / f"{ticker}_prices_2y.csv"],
+        "financials": [PROC_DIR / f"{ticker}_derived.csv",
+                       PROC_DIR / f"{ticker}_p1_summary.json"],
+        "filings":    [PROC_DIR / f"{ticker}_p2_filings.json"],
+        "news":       [PROC_DIR / f"{ticker}_p3_news.json"],
+        "executives": [PROC_DIR / f"{ticker}_p4_exec_ownership.json"],
+    }
+
+
+def _file_signature(paths: list[Path]) -> tuple:
+    """(name, mtime, size) per file; (name, None, None) for missing ones."""
+    sig = []
+    for path in paths:
+        try:
+            st = path.stat()
+            sig.append((path.name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append((path.name, None, None))
+    return tuple(sig)
+
+
+def data_stamp(ticker: str) -> tuple[str, datetime | None]:
+    """
+    (`data_version`, `last_modified`) of a ticker's ingestion outputs, from a
+    single stat of each file.
+    """
+    sig = [_file_signature(paths) for paths in source_files(_check_ticker(ticker)).values()]
+    mtimes = [mtime for files in sig for _, mtime, _ in files if mtime is not None]
+    newest = datetime.fromtimestamp(max(mtimes) / 1e9, timezone.utc) if mtimes else None
+    return hashlib.sha1(repr(sig).encode()).hexdigest()[:16], newest
+
+
+def data_version(ticker: str) -> str:
+    """
+    Cheap fingerprint of a ticker's ingestion outputs.
+
+    Built from (name, mtime, size) of every file in `source_files`, so it
+    changes whenever a pipeline rewrites, adds or removes one of them.
+    """
+    return data_stamp(ticker)[0]
+
+
+def last_modified(ticker: str) -> datetime | None:
+    """Newest mtime (UTC) among a ticker's existing input files, or None if there are none."""
+    return data_stamp(ticker)[1]
+
+
+# In-memory caches below are LRU-bounded by entry count. Callers hold the
+# cache's lock.
+
+def _lru_get(cache: OrderedDict, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key, value, limit: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+# Loader cache: parsed frames keyed on the signature of their source files
+
+# { (dataset, ticker): (file_signature, frame) } — least recently used first
+_loader_cache: OrderedDict[tuple[str, str], tuple[tuple, pd.DataFrame]] = OrderedDict()
+_loader_lock = threading.Lock()
+
+
+def _window(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    """
+    Rows of a date-sorted frame inside [start, end], plus the nearest row
+    before `start` and after `end` when they exist.
+    """
+    if df.empty or (start is None and end is None):
+        return df
+    idx = df.index
+    lo = 0 if start is None else max(idx.searchsorted(pd.Timestamp(start), "left") - 1, 0)
+    hi = len(idx) if end is None else min(idx.searchsorted(pd.Timestamp(end), "right") + 1, len(idx))
+    return df.iloc[lo:hi]
+
+
+def _cached_loader(dataset: str):
+    """
+    Cache a loader's result per ticker until one of its source files changes
+    (mtime or size). Cached frames have a sorted, tz-naive DatetimeIndex.
+
+    The wrapped loader takes an optional `start`/`end` window (see `_window`),
+    sliced from the cached frame.
+    """
+    def decorator(loader):
+        @functools.wraps(loader)
+        def wrapper(ticker: str, start=None, end=None) -> pd.DataFrame:
+            key = (dataset, ticker)
+            sig = _file_signature(source_files(ticker)[dataset])
+            with _loader_lock:
+                hit = _lru_get(_loader_cache, key)
+            if hit is not None and hit[0] == sig:
+                return _window(hit[1], start, end)
+
+            # Parse outside the lock; a concurrent duplicate parse is harmless
+            df = _to_utc_naive_index(loader(ticker))
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind="stable")
+            with _loader_lock:
+                _lru_put(_loader_cache, key, (sig, df), LOADER_CACHE_SIZE)
+            return _window(df, start, end)
+        return wrapper
+    return decorator
+
+
+def clear_loader_cache() -> None:
+    """Drop every cached loader frame."""
+    with _loader_lock:
+        _loader_cache.clear()
+
+
 # Loaders: read processed JSON/CSV into dated Series/DataFrames
 
+@_cached_loader("prices")
 def load_prices(ticker: str) -> pd.DataFrame:
     """Daily OHLCV — densest dataset."""
-    path = PROC_DIR.parent / "raw" / f"{ticker}_prices_2y.csv"
+    path = source_files(ticker)["prices"][0]
     if not path.exists():
         return pd.DataFrame()
     df = pd.read_csv(path, skiprows=3, header=0)
@@ -60,11 +221,11 @@ def load_prices(ticker: str) -> pd.DataFrame:
         columns={"close": "price_close", "volume": "price_volume"}
     )
 
+@_cached_loader("financials")
 def load_financials(ticker: str) -> pd.DataFrame:
     """Annual financials — sparse (1 row per year)."""
     # Prefer derived CSV if it exists
-    csv_path = PROC_DIR / f"{ticker}_derived.csv"
-    json_path = PROC_DIR / f"{ticker}_p1_summary.json"
+    csv_path, json_path = source_files(ticker)["financials"]
 
     try:
         if csv_path.exists():
@@ -98,9 +259,31 @@ def load_financials(ticker: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def _records_frame(records: list[dict], date_field: str, columns: dict[str, str]) -> pd.DataFrame:
+    """
+    Frame of `records` indexed by their `date_field`, parsed in one vectorized
+    call and normalized to UTC midnight. Records without a date are dropped;
+    `columns` maps record keys to output column names.
+    """
+    df = pd.DataFrame.from_records(records, columns=[date_field, *columns])
+    dates = df.pop(date_field)
+    keep = dates.notna() & dates.astype(bool)
+    if not keep.any():
+        return pd.DataFrame()
+    df = df[keep].rename(columns=columns)
+    try:
+        parsed = pd.to_datetime(dates[keep], utc=True, format="ISO8601")
+    except ValueError:
+        # Not all ISO 8601: infer the format per element (slower, still one call)
+        parsed = pd.to_datetime(dates[keep], utc=True, format="mixed")
+    df.index = pd.DatetimeIndex(parsed.dt.normalize().dt.tz_localize(None), name="date")
+    return df
+
+
+@_cached_loader("filings")
 def load_filings(ticker: str) -> pd.DataFrame:
     """SEC filings — sparse (few per year)."""
-    path = PROC_DIR / f"{ticker}_p2_filings.json"
+    path = source_files(ticker)["filings"][0]
     if not path.exists():
         return pd.DataFrame()
     try:
@@ -108,19 +291,13 @@ def load_filings(ticker: str) -> pd.DataFrame:
         filings = data.get("filings", [])
         if not filings:
             return pd.DataFrame()
-        rows = []
-        for f in filings:
-            d = f.get("filed_date")
-            if d:
-                rows.append({
-                    "date": pd.to_datetime(d, utc=True).tz_localize(None).normalize(),
-                    "filing_type":      f.get("form_type"),
-                    "filing_url":       f.get("filing_url"),
-                    "accession_number": f.get("accession_number"),
-                })
-        if not rows:
-            return pd.DataFrame()
-        df = pd.DataFrame(rows).set_index("date")
+        df = _records_frame(filings, "filed_date", {
+            "form_type":        "filing_type",
+            "filing_url":       "filing_url",
+            "accession_number": "accession_number",
+        })
+        if df.empty:
+            return df
         df = df[~df.index.duplicated(keep="last")]
         return df
     except Exception as e:
@@ -128,9 +305,10 @@ def load_filings(ticker: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+@_cached_loader("news")
 def load_news(ticker: str) -> pd.DataFrame:
     """News articles — semi-dense (multiple per day possible)."""
-    path = PROC_DIR / f"{ticker}_p3_news.json"
+    path = source_files(ticker)["news"][0]
     if not path.exists():
         return pd.DataFrame()
     try:
@@ -138,19 +316,13 @@ def load_news(ticker: str) -> pd.DataFrame:
         articles = data.get("articles", [])
         if not articles:
             return pd.DataFrame()
-        rows = []
-        for a in articles:
-            d = a.get("published_at")
-            if d:
-                rows.append({
-                    "date":          pd.to_datetime(d).normalize(),
-                    "news_title":    a.get("title"),
-                    "news_url":      a.get("url"),
-                    "news_publisher":a.get("publisher"),
-                })
-        if not rows:
-            return pd.DataFrame()
-        df = pd.DataFrame(rows).set_index("date")
+        df = _records_frame(articles, "published_at", {
+            "title":     "news_title",
+            "url":       "news_url",
+            "publisher": "news_publisher",
+        })
+        if df.empty:
+            return df
         # Keep most recent article per day
         df = df[~df.index.duplicated(keep="last")]
         return df
@@ -159,9 +331,10 @@ def load_news(ticker: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+@_cached_loader("executives")
 def load_executives(ticker: str) -> pd.DataFrame:
     """Executive snapshot — sparsest (1 snapshot, weekly refresh)."""
-    path = PROC_DIR / f"{ticker}_p4_exec_ownership.json"
+    path = source_files(ticker)["executives"][0]
     if not path.exists():
         return pd.DataFrame()
     try:
@@ -182,38 +355,153 @@ def load_executives(ticker: str) -> pd.DataFrame:
         log.warning(f"[{ticker}] load_executives: {e}")
         return pd.DataFrame()
 
-# Core Alignment Function
-def align(ticker: str, start: date, end: date) -> pd.DataFrame:
-    ticker = ticker.upper()
-    start_dt = pd.Timestamp(start).normalize()
-    end_dt   = pd.Timestamp(end).normalize()
+# Dataset name -> loader, in output column order
+LOADERS = {
+    "prices":     load_prices,
+    "financials": load_financials,
+    "filings":    load_filings,
+    "news":       load_news,
+    "executives": load_executives,
+}
+
 
-    datasets = {
-        "prices":     load_prices(ticker),
-        "financials": load_financials(ticker),
-        "filings":    load_filings(ticker),
-        "news":       load_news(ticker),
-        "executives": load_executives(ticker),
+def _dataset_names(datasets: list[str] | None) -> list[str]:
+    """Requested dataset names in output column order (None = all)."""
+    if datasets is None:
+        return list(LOADERS)
+    unknown = set(datasets) - set(LOADERS)
+    if unknown:
+        raise ValueError(f"unknown datasets {sorted(unknown)}; expected some of {list(LOADERS)}")
+    return [name for name in LOADERS if name in datasets]
+
+
+def _load(ticker: str, names: list[str], start=None, end=None) -> dict[str, pd.DataFrame]:
+    """Load only the named datasets, optionally windowed to [start, end]."""
+    return {
+        name: _to_utc_naive_index(LOADERS[name](ticker, start, end)) for name in names
     }
-    datasets = {k: _to_utc_naive_index(v) for k, v in datasets.items()}
 
-    available = {k: len(v) for k, v in datasets.items() if not v.empty}
-    log.info(f"[{ticker}] available datasets: {available}")
 
-    if not available:
-        log.warning(f"[{ticker}] No data available for alignment")
-        return pd.DataFrame()
+# Core Alignment Function
+
+class _Part(NamedTuple):
+    """Where one dataset's columns sit in an aligned frame."""
+    columns: slice       # column positions in the frame
+    exact: np.ndarray    # per row: the dataset has a row on that exact date
+    dtypes: pd.Series    # the dataset's own column dtypes
+
+
+# Calendars for the daily timeline index:
+#   daily   — every calendar day (default)
+#   trading — the ticker's price sessions (observed price dates); rows dated on
+#             other days roll forward to the next session. Rows dated after the
+#             last price bar get provisional weekday sessions until real bars
+#             arrive, so they are not dropped
+CALENDARS = ("daily", "trading")
+
+
+def _check_calendar(calendar: str, mode: str = "daily") -> None:
+    if calendar not in CALENDARS:
+        raise ValueError(f"unknown calendar {calendar!r}; expected one of {list(CALENDARS)}")
+    if calendar != "daily" and mode != "daily":
+        raise ValueError("calendar only applies to mode='daily'")
+
+
+def _sessions(prices: pd.DataFrame, datasets: dict[str, pd.DataFrame]) -> pd.DatetimeIndex | None:
+    """
+    Trading sessions: the observed price dates, then weekdays up to the first
+    one on or after the latest row of `datasets` (so rows dated after the last
+    price bar still have a session to roll into). Only weekdays when there
+    are no prices.
+    """
+    days = _calendar_index(datasets)
+    if days is None:
+        return None
+    if prices.empty:
+        log.warning("no price dates to use as trading sessions; falling back to weekdays")
+        return pd.bdate_range(days[0], pd.offsets.BDay().rollforward(days[-1]), name="date")
+    sessions = pd.DatetimeIndex(prices.index.normalize().unique(), name="date")
+    if days[-1] > sessions[-1]:
+        provisional = pd.bdate_range(
+            sessions[-1] + pd.Timedelta(days=1), pd.offsets.BDay().rollforward(days[-1])
+        )
+        sessions = sessions.append(provisional).rename("date")
+    return sessions
+
+
+def _calendar_index(
+    datasets: dict[str, pd.DataFrame], sessions: pd.DatetimeIndex | None = None
+) -> pd.DatetimeIndex | None:
+    """
+    Timeline index covering every row of `datasets`: each calendar day from
+    the earliest to the latest, or with `sessions`, each session from the one
+    the earliest row rolls into to the one the latest row rolls into.
+    """
+    loaded = [df for df in datasets.values() if not df.empty]
+    if not loaded:
+        return None
+    earliest = min(df.index.min() for df in loaded).normalize()
+    latest   = max(df.index.max() for df in loaded).normalize()
+    if sessions is None:
+        return pd.date_range(start=earliest, end=latest, freq="D", name="date")
+    lo = sessions.searchsorted(earliest, "left")
+    hi = min(sessions.searchsorted(latest, "left") + 1, len(sessions))
+    return sessions[lo:hi] if lo < hi else None
 
-    # clip requested range to available data across all datasets
-    earliest = min(df.index.min() for df in datasets.values() if not df.empty).normalize()
-    latest   = max(df.index.max() for df in datasets.values() if not df.empty).normalize()
 
+def _roll_to_sessions(
+    df: pd.DataFrame, sessions: pd.DatetimeIndex, index: pd.DatetimeIndex
+) -> pd.DataFrame:
+    """
+    Rows of `df` moved to the first session on or after their date, keeping
+    only sessions in `index` (a run of `sessions`). When several rows land on
+    one session, each column keeps its last non-null value.
+    """
+    pos = sessions.searchsorted(df.index.normalize(), "left")
+    has_session = pos < len(sessions)
+    dates = sessions[pos[has_session]]
+    keep = (dates >= index[0]) & (dates <= index[-1]) if len(index) else np.zeros(len(dates), dtype=bool)
+    rolled = df[has_session][keep].groupby(dates[keep]).last()
+    rolled.index.name = "date"
+    return rolled
+
+
+def _daily_frame(
+    datasets: dict[str, pd.DataFrame],
+    date_index: pd.DatetimeIndex,
+    sessions: pd.DatetimeIndex | None = None,
+) -> tuple[pd.DataFrame, dict[str, _Part]]:
+    """
+    Every non-empty dataset reindexed onto `date_index` and combined in one
+    concat — not yet forward-filled. Values dated off the index are dropped,
+    unless `sessions` is given: then they roll forward to the next session.
+    With no data in any dataset the frame has the index but no columns.
+    """
+    frames, parts, col = [], {}, 0
+    for name, df in datasets.items():
+        if df.empty:
+            continue
+        if sessions is not None:
+            dtypes = df.dtypes
+            df = _roll_to_sessions(df, sessions, date_index)
+            # groupby().last() keeps dtypes; restore them for an empty result too
+            df = df.astype(dtypes.to_dict()) if df.empty else df
+        frames.append(df.reindex(date_index))
+        parts[name] = _Part(slice(col, col + len(df.columns)), date_index.isin(df.index), df.dtypes)
+        col += len(df.columns)
+    if not frames:
+        return pd.DataFrame(index=date_index, columns=pd.Index([], dtype=str)), parts
+    return pd.concat(frames, axis=1), parts
+
+
+def _clip_range(ticker: str, start_dt, end_dt, earliest, latest):
+    """[start, end] clipped to [earliest, latest]; None when they don't overlap."""
     if end_dt < earliest or start_dt > latest:
         log.warning(
             f"[{ticker}] requested range outside available data: {start_dt.date()}->{end_dt.date()} "
             f"(available {earliest.date()}->{latest.date()})"
         )
-        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+        return None
 
     if start_dt < earliest:
         log.info(f"[{ticker}] shifting start {start_dt.date()} -> {earliest.date()} (earliest available)")
@@ -222,85 +510,585 @@ def align(ticker: str, start: date, end: date) -> pd.DataFrame:
     if end_dt > latest:
         log.info(f"[{ticker}] shifting end {end_dt.date()} -> {latest.date()} (latest available)")
         end_dt = latest
+    return start_dt, end_dt
 
-    # Build unified daily index over the clipped range
-    date_index = pd.date_range(start=start_dt, end=end_dt, freq="D")
 
-    aligned = pd.DataFrame(index=date_index)
-    aligned.index.name = "date"
+def align(
+    ticker: str,
+    start: date,
+    end: date,
+    datasets: list[str] | None = None,
+    calendar: str = "daily",
+) -> pd.DataFrame:
+    """
+    Daily calendar index over [start, end], every dataset forward-filled onto it.
 
-    for name, df in datasets.items():
-        if df.empty:
-            continue
-        df_reindexed = df.reindex(date_index, method=None)
-        df_filled = df_reindexed.ffill()
-        aligned = aligned.join(df_filled, how="left")
+    `datasets` restricts which loaders run (default: all). Datasets that are
+    not requested are never read, so the range is clipped to the data of the
+    requested ones: e.g. prices alone end at the last price bar, even when
+    newer news exists. With calendar="trading" the index is the ticker's price
+    sessions instead (see CALENDARS); the prices are then read for the
+    sessions, requested or not.
+    """
+    ticker = _check_ticker(ticker)
+    _check_calendar(calendar)
+    start_dt = pd.Timestamp(start).normalize()
+    end_dt   = pd.Timestamp(end).normalize()
+    names = _dataset_names(datasets)
+
+    if calendar == "trading":
+        # Rolling forward needs every row since the previous session: no pushdown
+        datasets = _load(ticker, names)
+        prices = datasets["prices"] if "prices" in datasets else LOADERS["prices"](ticker)
+        sessions = _sessions(prices, datasets)
+    else:
+        # Window pushdown: loaders return [start, end] plus one row either side,
+        # which is all the clipping below and the daily reindex look at
+        datasets = _load(ticker, names, start_dt, end_dt)
+        sessions = None
+
+    available = {k: len(v) for k, v in datasets.items() if not v.empty}
+    log.info(f"[{ticker}] available datasets: {available}")
+
+    full_index = _calendar_index(datasets, sessions)
+    if full_index is None:
+        log.warning(f"[{ticker}] No data available for alignment")
+        return pd.DataFrame()
+
+    # clip requested range to available data across the loaded datasets
+    clipped = _clip_range(ticker, start_dt, end_dt, full_index[0], full_index[-1])
+    if clipped is None:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    start_dt, end_dt = clipped
+
+    # Unified index over the clipped range
+    date_index = full_index[full_index.searchsorted(start_dt):full_index.searchsorted(end_dt, "right")]
+
+    # A single ffill over the combined frame equals ffilling each dataset
+    # separately because no two datasets share a column
+    aligned = _daily_frame(datasets, date_index, sessions)[0].ffill()
 
     log.info(f"[{ticker}] aligned: {len(aligned)} rows × {len(aligned.columns)} cols "
              f"({start_dt.date()} -> {end_dt.date()})")
     return aligned
 
 
-def align_to_sparse_ref(
-    ticker: str,
-    start: date,
-    end: date,
-) -> pd.DataFrame:
+def _asof(df: pd.DataFrame, on: pd.DatetimeIndex) -> pd.DataFrame:
     """
-    Strict version: uses the SPARSEST available dataset as the date index.
-    Only returns rows where the sparse reference has a real data point.
-    Use this when you want to avoid over-dense timelines.
+    Backward as-of lookup of a date-sorted frame: for each date in `on`, every
+    column's last non-null value at or before it (NaN before the first row).
+
+    Same values and dtypes as reindexing `df` onto the union of both indexes,
+    forward-filling and picking `on`, but each column costs one sorted search
+    per date in `on`; only a column with gaps at the looked-up rows is scanned.
     """
-    ticker = ticker.upper()
+    pos = df.index.searchsorted(on, side="right") - 1
+    exact = df.index.get_indexer(on)  # -1 where the date is not a row of df
+    columns = {}
+    for name in df.columns:
+        values = df[name].array
+        taken = values.take(pos, allow_fill=True)
+        gaps = pd.isna(taken) & (pos >= 0)
+        if gaps.any():
+            # Fall back to the last non-null row at or before each position
+            valid = np.flatnonzero(pd.notna(values))
+            j = np.searchsorted(valid, pos, side="right") - 1
+            src = exact.copy()
+            src[j >= 0] = valid[j[j >= 0]]
+            taken = values.take(src, allow_fill=True)
+        columns[name] = taken
+    out = pd.DataFrame(columns, index=on)
+    if (exact < 0).any():
+        # The union reindex would have inserted NaN rows: upcast the same way
+        dtypes = df.head(0).reindex(pd.DatetimeIndex([pd.NaT])).dtypes
+    else:
+        dtypes = df.dtypes
+    return out.astype(dtypes.to_dict())
 
-    datasets = {
-        "prices":     load_prices(ticker),
-        "financials": load_financials(ticker),
-        "filings":    load_filings(ticker),
-        "news":       load_news(ticker),
-        "executives": load_executives(ticker),
-    }
 
-    datasets = {k: _to_utc_naive_index(v) for k, v in datasets.items()}
+def _sparse_frame(
+    ticker: str, names: list[str], start_dt, end_dt, loaded: dict | None = None
+) -> tuple[pd.DataFrame, dict[str, _Part]] | None:
+    """
+    Rows at the sparsest dataset's dates within [start_dt, end_dt] (either may
+    be None for unbounded), every requested dataset as of each date. None when
+    there is no reference data in range.
+
+    `loaded`, if given, receives every loader frame consulted — the requested
+    datasets plus the ones checked while picking the reference clock.
+    """
+    datasets = _load(ticker, names)
+    if loaded is not None:
+        loaded.update(datasets)
 
-    # Find sparsest available dataset
+    # Find sparsest available dataset (loading unrequested ones only as needed)
     ref_name = None
     ref_df = None
     for name in SPARSITY_ORDER:
-        df = datasets.get(name)
-        if df is not None and not df.empty:
+        df = datasets[name] if name in datasets else _load(ticker, [name])[name]
+        if loaded is not None:
+            loaded[name] = df
+        if not df.empty:
             ref_name = name
             ref_df = df
             break
 
     if ref_df is None:
-        return pd.DataFrame()
+        return None
 
     log.info(f"[{ticker}] sparse reference clock: {ref_name} ({len(ref_df)} points)")
 
-    start_dt = pd.Timestamp(start)
-    end_dt   = pd.Timestamp(end)
-
-    # Filter reference to date range
-    ref_filtered = ref_df.loc[
-        (ref_df.index >= start_dt) & (ref_df.index <= end_dt)
-    ]
+    # Filter reference to date range (loader frames are date-sorted)
+    ref_filtered = ref_df.loc[start_dt:end_dt]
     if ref_filtered.empty:
         log.warning(f"[{ticker}] sparse ref '{ref_name}' has no data in range")
-        return pd.DataFrame()
+        return None
 
-    aligned = pd.DataFrame(index=ref_filtered.index)
+    aligned = pd.DataFrame(index=ref_filtered.index, columns=pd.Index([], dtype=str))
     aligned.index.name = "date"
-    aligned = aligned.join(ref_filtered)
+    parts, col = {}, 0
+    if ref_name in datasets:
+        aligned = aligned.join(ref_filtered)
+        n = len(ref_filtered.columns)
+        parts[ref_name] = _Part(slice(0, n), np.ones(len(aligned), dtype=bool), ref_df.dtypes)
+        col = n
 
-    # Join other datasets using ffill onto sparse reference dates
+    # Join other datasets as of each sparse reference date (last known values)
     for name, df in datasets.items():
         if name == ref_name or df.empty:
             continue
-        # Reindex onto sparse ref dates, ffill from prior values
-        combined_index = df.index.union(ref_filtered.index).sort_values()
-        df_reindexed = df.reindex(combined_index).ffill()
-        df_on_ref = df_reindexed.reindex(ref_filtered.index)
+        df_on_ref = _asof(df, ref_filtered.index)
         aligned = aligned.join(df_on_ref, how="left", rsuffix=f"_{name}")
+        parts[name] = _Part(
+            slice(col, col + len(df.columns)), ref_filtered.index.isin(df.index), df.dtypes
+        )
+        col += len(df.columns)
 
-    return aligned
+    return aligned, parts
+
+
+def align_to_sparse_ref(
+    ticker: str,
+    start: date,
+    end: date,
+    datasets: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Strict version: uses the SPARSEST available dataset as the date index.
+    Only returns rows where the sparse reference has a real data point.
+    Use this when you want to avoid over-dense timelines.
+
+    `datasets` restricts which datasets' columns are loaded and returned
+    (default: all). The reference clock is still the sparsest dataset with
+    data, requested or not, so row dates don't depend on `datasets`.
+    """
+    ticker = _check_ticker(ticker)
+    result = _sparse_frame(ticker, _dataset_names(datasets), pd.Timestamp(start), pd.Timestamp(end))
+    return pd.DataFrame() if result is None else result[0]
+
+
+# Materialized timelines: the full aligned history per (ticker, mode,
+# datasets, calendar)
+#
+# Most requests are windows over the same history, so the whole timeline is
+# aligned once per input data version and a request becomes an index slice.
+# Like `align`, a timeline only reads the datasets it was asked for, so each
+# `include` combination has its own; the LRU bound keeps their number fixed.
+# Daily timelines are stored before forward-filling: filling after slicing
+# keeps align()'s rule that values dated before `start` are not carried in.
+
+MODES = ("daily", "sparse")
+
+
+class Timeline(NamedTuple):
+    version: str                # data_version() of the inputs it was built from
+    frame: pd.DataFrame         # daily: not forward-filled yet; sparse: final rows
+    parts: dict[str, _Part]     # dataset -> its columns in `frame`
+    sources: dict[str, pd.DataFrame]  # loader frames it was built from
+
+
+# { (ticker, mode, dataset names, calendar): Timeline } — least recently used first
+_timelines: OrderedDict[tuple[str, str, tuple[str, ...], str], Timeline] = OrderedDict()
+_timeline_lock = threading.Lock()
+
+
+def clear_timeline_cache() -> None:
+    """Drop every materialized timeline held in memory (files on disk stay)."""
+    with _timeline_lock:
+        _timelines.clear()
+
+
+def _timeline_path(key: tuple[str, str, tuple[str, ...], str]) -> Path:
+    ticker, mode, names, calendar = key
+    path = TIMELINE_DIR / f"{ticker}_{mode}_{calendar}_{'-'.join(names)}.zip"
+    if not path.resolve().is_relative_to(TIMELINE_DIR.resolve()):
+        raise ValueError(f"timeline path for {ticker!r} is outside {TIMELINE_DIR}")
+    return path
+
+
+# On disk a timeline is a zip of Parquet frames (the frame, each source, the
+# parts' exact-date flags) plus meta.json for the rest — no pickles, so a
+# timeline file can't run code when it is read. Parquet needs pyarrow;
+# without it timelines are simply not persisted.
+
+def _frame_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_parquet(buf)
+    return buf.getvalue()
+
+
+def _frame_from(data: bytes, freq: str | None) -> pd.DataFrame:
+    df = pd.read_parquet(io.BytesIO(data))
+    if freq is not None:
+        # Parquet keeps the dates but not the index frequency
+        df.index = pd.DatetimeIndex(df.index, freq=freq)
+    return df
+
+
+def _read_timeline(key) -> Timeline | None:
+    try:
+        path = _timeline_path(key)
+        with zipfile.ZipFile(path) as z:
+            meta = json.loads(z.read("meta.json"))
+            frame = _frame_from(z.read("frame.parquet"), meta["freq"]["frame"])
+            exact = pd.read_parquet(io.BytesIO(z.read("exact.parquet")))
+            sources = {
+                name: _frame_from(z.read(f"sources/{name}.parquet"), freq)
+                for name, freq in meta["freq"]["sources"].items()
+            }
+        parts = {
+            name: _Part(
+                slice(*part["columns"]),
+                exact[name].to_numpy(dtype=bool),
+                pd.Series(
+                    [pd.api.types.pandas_dtype(d) for _, d in part["dtypes"]],
+                    index=pd.Index([c for c, _ in part["dtypes"]], dtype=str),
+                    dtype=object,
+                ),
+            )
+            for name, part in meta["parts"].items()
+        }
+        return Timeline(meta["version"], frame, parts, sources)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning(f"could not read timeline for {key[0]}: {e}")
+        return None
+
+
+def _write_timeline(key, tl: Timeline) -> None:
+    try:
+        path = _timeline_path(key)
+        meta = {
+            "version": tl.version,
+            "parts": {
+                name: {
+                    "columns": [part.columns.start, part.columns.stop],
+                    "dtypes":  [[col, str(dtype)] for col, dtype in part.dtypes.items()],
+                }
+                for name, part in tl.parts.items()
+            },
+            "freq": {
+                "frame":   getattr(tl.frame.index, "freqstr", None),
+                "sources": {name: getattr(df.index, "freqstr", None) for name, df in tl.sources.items()},
+            },
+        }
+        exact = pd.DataFrame({name: part.exact for name, part in tl.parts.items()})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with zipfile.ZipFile(tmp, "w") as z:
+            z.writestr("meta.json", json.dumps(meta))
+            z.writestr("frame.parquet", _frame_bytes(tl.frame))
+            z.writestr("exact.parquet", _frame_bytes(exact))
+            for name, df in tl.sources.items():
+                z.writestr(f"sources/{name}.parquet", _frame_bytes(df))
+        tmp.replace(path)
+    except Exception as e:
+        log.warning(f"could not write timeline for {key[0]}: {e}")
+
+
+def _daily_inputs(sources: dict[str, pd.DataFrame], names: list[str], calendar: str):
+    """
+    (requested datasets, trading sessions or None, timeline index or None) for
+    a daily timeline, as in `align`.
+    """
+    datasets = {name: sources[name] for name in names}
+    sessions = _sessions(sources["prices"], datasets) if calendar == "trading" else None
+    return datasets, sessions, _calendar_index(datasets, sessions)
+
+
+def _build_timeline(ticker: str, mode: str, names: list[str], calendar: str, version: str) -> Timeline:
+    if mode == "sparse":
+        sources: dict[str, pd.DataFrame] = {}
+        result = _sparse_frame(ticker, names, None, None, loaded=sources)
+        frame, parts = result if result is not None else (pd.DataFrame(), {})
+        return Timeline(version, frame, parts, sources)
+
+    # The trading calendar comes from the prices, requested or not
+    sources = _load(ticker, names + ["prices"] if calendar == "trading" and "prices" not in names else names)
+    datasets, sessions, date_index = _daily_inputs(sources, names, calendar)
+    if date_index is None:
+        return Timeline(version, pd.DataFrame(), {}, sources)
+    frame, parts = _daily_frame(datasets, date_index, sessions)
+    return Timeline(version, frame, parts, sources)
+
+
+# Incremental updates: when inputs change, only the rows from the earliest
+# changed date onwards are realigned and spliced onto the unchanged head.
+# A daily row depends only on the datasets' rows on that date (trading
+# calendar: since the previous session), and a sparse row only on rows at or
+# before its date, so earlier rows cannot change.
+
+def _first_change(old: pd.DataFrame, new: pd.DataFrame):
+    """
+    Earliest date at which two versions of a loader frame differ: None when
+    they are equal, pd.Timestamp.min when the change can't be spliced (columns
+    or dtypes changed, or the dataset appeared or disappeared).
+    """
+    if old is new:
+        return None
+    if old.empty or new.empty:
+        return None if old.empty and new.empty else pd.Timestamp.min
+    if list(old.columns) != list(new.columns) or not old.dtypes.equals(new.dtypes):
+        return pd.Timestamp.min
+    n = min(len(old), len(new))
+    a = old.iloc[:n].reset_index(drop=True)
+    b = new.iloc[:n].reset_index(drop=True)
+    same = (a.eq(b).fillna(False) | (a.isna() & b.isna())).all(axis=1).to_numpy()
+    same = same & (old.index[:n] == new.index[:n])
+    if same.all():
+        if len(old) == len(new):
+            return None
+        return (old if len(old) > n else new).index[n]
+    first = int(np.argmin(same))
+    return min(old.index[first], new.index[first])
+
+
+def _update_timeline(
+    ticker: str, mode: str, names: list[str], calendar: str, old: Timeline, version: str
+) -> Timeline | None:
+    """
+    `old` brought up to date by realigning only its tail, or None when the
+    change needs a full rebuild.
+    """
+    sources = _load(ticker, list(old.sources))
+    changes = [_first_change(old.sources[name], sources[name]) for name in sources]
+    changes = [c for c in changes if c is not None]
+    if not changes:
+        # Files were rewritten with the same rows
+        return old._replace(version=version, sources=sources)
+    cutoff = min(changes)
+    if cutoff == pd.Timestamp.min or old.frame.empty:
+        return None
+    cutoff = cutoff.normalize()
+    cut = old.frame.index.searchsorted(cutoff, "left")
+
+    if mode == "daily":
+        datasets, sessions, date_index = _daily_inputs(sources, names, calendar)
+        # Rows before the cut keep their dates, unless the index itself moved
+        # (e.g. a provisional session replaced by a real bar on another day)
+        if date_index is None or not date_index[:cut].equals(old.frame.index[:cut]):
+            return None
+        tail, tail_parts = _daily_frame(datasets, date_index[cut:], sessions)
+    else:
+        result = _sparse_frame(ticker, names, cutoff, None)
+        if result is None:
+            if cut < len(old.frame):
+                return None
+            # No reference dates from the change on: every row stays as it was
+            return old._replace(version=version, sources=sources)
+        tail, tail_parts = result
+
+    if list(tail.columns) != list(old.frame.columns) or tail_parts.keys() != old.parts.keys():
+        return None
+    frame = pd.concat([old.frame.iloc[:cut], tail])
+    if mode == "daily":
+        frame.index = date_index
+    parts = {
+        name: part._replace(
+            exact=np.concatenate([part.exact[:cut], tail_parts[name].exact]),
+            dtypes=tail_parts[name].dtypes,
+        )
+        for name, part in old.parts.items()
+    }
+    # The old head may carry an upcast only its old tail needed
+    frame = _restore_dtypes(frame, parts, slice(None))
+    log.info(f"[{ticker}] updated {mode} timeline from {cutoff.date()}: "
+             f"realigned {len(tail)} of {len(frame)} rows (version {version})")
+    return Timeline(version, frame, parts, sources)
+
+
+def timeline(
+    ticker: str,
+    mode: str = "daily",
+    calendar: str = "daily",
+    datasets: list[str] | None = None,
+) -> Timeline:
+    """
+    Full aligned timeline of `datasets` (default: all) for `ticker`, updated
+    only when `data_version` changes — incrementally from the earliest
+    changed date when possible. The TIMELINE_CACHE_SIZE most recently used
+    are kept in memory, and all of them on disk under TIMELINE_DIR when
+    PERSIST_TIMELINES is set (so restarts and other workers reuse them).
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {list(MODES)}")
+    _check_calendar(calendar, mode)
+    ticker = _check_ticker(ticker)
+    names = _dataset_names(datasets)
+    key = (ticker, mode, tuple(names), calendar)
+    version = data_version(ticker)
+
+    with _timeline_lock:
+        tl = _lru_get(_timelines, key)
+    if (tl is None or tl.version != version) and PERSIST_TIMELINES:
+        tl = _read_timeline(key) or tl
+        if tl is not None and tl.version == version:
+            with _timeline_lock:
+                _lru_put(_timelines, key, tl, TIMELINE_CACHE_SIZE)
+    if tl is not None and tl.version == version:
+        return tl
+
+    # Build outside the lock; a concurrent duplicate build is harmless
+    if tl is not None:
+        tl = _update_timeline(ticker, mode, names, calendar, tl, version)
+    if tl is None:
+        tl = _build_timeline(ticker, mode, names, calendar, version)
+        log.info(f"[{ticker}] materialized {mode} timeline: {len(tl.frame)} rows × "
+                 f"{len(tl.frame.columns)} cols (version {version})")
+    with _timeline_lock:
+        _lru_put(_timelines, key, tl, TIMELINE_CACHE_SIZE)
+    if PERSIST_TIMELINES:
+        _write_timeline(key, tl)
+    return tl
+
+
+def _restore_dtypes(frame: pd.DataFrame, parts: dict[str, _Part], rows: slice) -> pd.DataFrame:
+    """
+    Give back a dataset its own dtypes when it has a row on every date of the
+    slice — a window aligned on its own would not have upcast it (int -> float).
+    """
+    casts = {}
+    for part in parts.values():
+        if part.exact[rows].all():
+            for col, dtype in zip(frame.columns[part.columns], part.dtypes):
+                if frame[col].dtype != dtype:
+                    casts[col] = dtype
+    return frame.astype(casts) if casts else frame
+
+
+def align_window(
+    ticker: str,
+    start: date,
+    end: date,
+    datasets: list[str] | None = None,
+    mode: str = "daily",
+    calendar: str = "daily",
+) -> pd.DataFrame:
+    """
+    Same result as `align` (mode="daily") or `align_to_sparse_ref`
+    (mode="sparse"), sliced out of the materialized `timeline`.
+    """
+    ticker = _check_ticker(ticker)
+    tl = timeline(ticker, mode, calendar, datasets)
+    index = tl.frame.index
+    if len(index) == 0:
+        log.warning(f"[{ticker}] No data available for alignment")
+        return pd.DataFrame()
+
+    if mode == "daily":
+        clipped = _clip_range(
+            ticker, pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(),
+            index[0], index[-1],
+        )
+        if clipped is None:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+        start_dt, end_dt = clipped
+    else:
+        start_dt, end_dt = pd.Timestamp(start), pd.Timestamp(end)
+
+    rows = slice(index.searchsorted(start_dt, "left"), index.searchsorted(end_dt, "right"))
+    window = _restore_dtypes(tl.frame.iloc[rows], tl.parts, rows)
+    if mode == "daily":
+        return window.ffill()
+    if len(window) == 0:
+        log.warning(f"[{ticker}] sparse timeline has no data in range")
+        return pd.DataFrame()
+    return window
+
+
+# Multi-ticker panels
+
+def _onto(df: pd.DataFrame, index: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    An aligned daily frame reindexed onto a wider `index`: dates inside its
+    own range carry its last row at or before them, dates outside are null.
+    """
+    inside = index[(index >= df.index[0]) & (index <= df.index[-1])]
+    if len(inside) != len(df):
+        df = df.reindex(inside, method="ffill")
+    return df.reindex(index)
+
+
+def _empty_panel() -> pd.DataFrame:
+    """A panel with no rows, still indexed by (date, ticker)."""
+    index = pd.MultiIndex.from_arrays(
+        [pd.DatetimeIndex([], dtype="datetime64[us]"), pd.Index([], dtype=str)],
+        names=["date", "ticker"],
+    )
+    return pd.DataFrame(index=index, columns=pd.Index([], dtype=str))
+
+
+def align_many(
+    tickers: list[str],
+    start: date,
+    end: date,
+    datasets: list[str] | None = None,
+    mode: str = "daily",
+    calendar: str = "daily",
+    max_workers: int = 8,
+) -> pd.DataFrame:
+    """
+    `align_window` for several tickers at once, as one long frame indexed by
+    (date, ticker). Tickers are aligned in parallel threads.
+
+    In daily mode every ticker has a row on every date of one shared index:
+    each day from the earliest to the latest date any ticker has in range
+    (calendar="trading": the union of the tickers' sessions). A ticker's rows
+    outside its own data range are null; sessions only other tickers have
+    carry its previous values. Sparse mode keeps each ticker's own reference
+    dates. Tickers without data contribute no rows, and columns a ticker
+    lacks are null for its rows. With no rows at all the frame is still
+    indexed by (date, ticker).
+    """
+    tickers = list(dict.fromkeys(_check_ticker(t) for t in tickers))
+    names = _dataset_names(datasets)  # validate before starting any thread
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {list(MODES)}")
+    _check_calendar(calendar, mode)
+    if not tickers:
+        return _empty_panel()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as pool:
+        frames = list(pool.map(lambda t: align_window(t, start, end, names, mode, calendar), tickers))
+
+    frames = {t: df for t, df in zip(tickers, frames) if not df.empty}
+    if not frames:
+        return _empty_panel()
+    if mode == "daily":
+        if calendar == "trading":
+            index = functools.reduce(pd.Index.union, (df.index for df in frames.values()))
+        else:
+            index = pd.date_range(
+                min(df.index[0] for df in frames.values()),
+                max(df.index[-1] for df in frames.values()),
+                freq="D",
+            )
+        index = pd.DatetimeIndex(index, name="date")
+        frames = {t: _onto(df, index) for t, df in frames.items()}
+    panel = pd.concat(frames, names=["ticker", "date"])
+    # (date, ticker) order; a stable sort keeps tickers in request order per date
+    panel = panel.swaplevel().sort_index(level="date", sort_remaining=False, kind="stable")
+    log.info(f"aligned panel: {len(frames)}/{len(tickers)} tickers, {len(panel)} rows × "
+             f"{len(panel.columns)} cols")
+    return panel
@@ -23,6 +23,18 @@ LOG_DIR   = BASE_DIR / "logs"
 for d in [RAW_DIR, PROC_DIR, LOG_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
+# Materialized alignment timelines (ingestion/core/alignment.py) are also
+# saved here (Parquet + JSON, needs pyarrow) when PERSIST_TIMELINES=1, so
+# restarts and other workers reuse them
+TIMELINE_DIR = DATA_DIR / "timelines"
+PERSIST_TIMELINES = os.getenv("PERSIST_TIMELINES", "0") == "1"
+
+# Entries kept in alignment's in-memory caches (least recently used go first):
+# parsed loader frames (one per dataset per ticker) and materialized timelines
+# (one per ticker, mode, calendar and requested dataset combination)
+LOADER_CACHE_SIZE   = int(os.getenv("LOADER_CACHE_SIZE", "128"))
+TIMELINE_CACHE_SIZE = int(os.getenv("TIMELINE_CACHE_SIZE", "48"))
+
 # Cache TTLs (hours)
 TTL = {
     "market":     24,    # Pipeline 1: daily
@@ -0,0 +1,38 @@
+"""
+tests/conftest.py
+
+Shared fixtures. The project root goes on sys.path so `app` and `ingestion`
+import as they do for the API (see app/routers/aligned_data.py).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ingestion.core import alignment  # noqa: E402
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """
+    Empty raw/, processed/ and timelines/ directories the alignment engine
+    reads from and writes to instead of data/. In-memory caches are cleared
+    before and after, and timelines are not persisted unless a test turns
+    PERSIST_TIMELINES back on.
+    """
+    dirs = {name: tmp_path / name for name in ("raw", "processed", "timelines")}
+    for path in dirs.values():
+        path.mkdir()
+    monkeypatch.setattr(alignment, "RAW_DIR", dirs["raw"])
+    monkeypatch.setattr(alignment, "PROC_DIR", dirs["processed"])
+    monkeypatch.setattr(alignment, "TIMELINE_DIR", dirs["timelines"])
+    monkeypatch.setattr(alignment, "PERSIST_TIMELINES", False)
+    alignment.clear_loader_cache()
+    alignment.clear_timeline_cache()
+    yield dirs
+    alignment.clear_loader_cache()
+    alignment.clear_timeline_cache()
@@ -0,0 +1,190 @@
+"""
+tests/test_cache.py
+
+The `cached` decorator's conditional requests (ETag / Last-Modified / 304)
+on a small app, and the SQLite backend.
+"""
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core import cache
+from app.core.cache_backends import CacheEntry, MemoryBackend, SQLiteBackend
+
+MODIFIED = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def backend():
+    """A fresh in-memory backend for the decorator, restored afterwards."""
+    old = cache._backend
+    cache.set_backend(MemoryBackend(max_entries=64, max_bytes=1 << 20))
+    yield cache._backend
+    cache.set_backend(old)
+
+
+@pytest.fixture
+def served(backend):
+    """(client, data state, handler calls) for an app with one cached route."""
+    state = {"version": "v1", "modified": MODIFIED}
+    calls = Counter()
+    app = FastAPI()
+
+    @app.get("/items/{name}")
+    @cache.cached(ttl=60, version=lambda name, **_: (state["version"], state["modified"]))
+    async def item(name: str, size: int = 10):
+        calls[name] += 1
+        return {"name": name, "rows": ["x" * 40] * size, "version": state["version"]}
+
+    with TestClient(app) as client:
+        yield client, state, calls
+
+
+def test_etag_revalidates_with_304(served):
+    client, _, calls = served
+    first = client.get("/items/a", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"] == format_datetime(MODIFIED, usegmt=True)
+
+    again = client.get("/items/a", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    # Weak comparison: a W/ prefix still matches
+    assert client.get("/items/a", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert calls["a"] == 1
+
+
+def test_etag_differs_per_arguments(served):
+    client, _, _ = served
+    a = client.get("/items/a", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    b = client.get("/items/b", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    assert a != b
+    assert client.get("/items/b", headers={"If-None-Match": a}).status_code == 200
+
+
+def test_compressed_variant_etag_validates(served):
+    client, _, calls = served
+    gz = client.get("/items/big?size=200", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.headers["etag"].endswith('-gzip"')
+    plain = client.get("/items/big?size=200", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] != gz.headers["etag"]
+    for etag in (gz.headers["etag"], plain.headers["etag"]):
+        assert client.get("/items/big?size=200", headers={"If-None-Match": etag}).status_code == 304
+    assert calls["big"] == 1
+
+
+def test_new_data_version_changes_etag(served):
+    client, state, calls = served
+    etag = client.get("/items/a").headers["etag"]
+    state["version"] = "v2"
+    response = client.get("/items/a", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["version"] == "v2"
+    assert calls["a"] == 2
+
+
+def test_if_modified_since(served):
+    client, state, calls = served
+    client.get("/items/a")
+    since = format_datetime(MODIFIED, usegmt=True)
+    assert client.get("/items/a", headers={"If-Modified-Since": since}).status_code == 304
+    earlier = format_datetime(MODIFIED - timedelta(seconds=1), usegmt=True)
+    assert client.get("/items/a", headers={"If-Modified-Since": earlier}).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    response = client.get("/items/a", headers={"If-None-Match": '"other"', "If-Modified-Since": since})
+    assert response.status_code == 200
+    assert calls["a"] == 1
+
+
+# SQLite backend
+
+def entry(version: str = "v1", ttl: float = 60, body: bytes = b'{"ok":true}', **fields) -> CacheEntry:
+    now = time.time()
+    return CacheEntry(now + ttl, now + ttl, version, "application/json", body, **fields)
+
+
+def sqlite_backend(tmp_path, **limits) -> SQLiteBackend:
+    limits = {"max_entries": 100, "max_bytes": 1 << 20, **limits}
+    return SQLiteBackend(tmp_path / "cache.sqlite3", **limits)
+
+
+def test_sqlite_round_trip_shared_between_workers(tmp_path):
+    async def run():
+        writer, reader = sqlite_backend(tmp_path), sqlite_backend(tmp_path)
+        stored = entry(gzip=b"gz", br=None, status=201,
+                       headers=(("set-cookie", "a=1"), ("set-cookie", "b=2")))
+        await writer.set(("fn", ("AAPL",)), stored)
+        # A second connection to the same file, as another worker would open
+        got = await reader.get(("fn", ("AAPL",)))
+        missing = await reader.get(("fn", ("MSFT",)))
+        await writer.close()
+        await reader.close()
+        return stored, got, missing
+
+    stored, got, missing = asyncio.run(run())
+    assert got == stored
+    assert missing is None
+
+
+def test_sqlite_evicts_oldest_over_budget(tmp_path):
+    async def run():
+        backend = sqlite_backend(tmp_path, max_entries=2)
+        for ticker in ("A", "B", "C"):
+            await backend.set(("fn", (ticker,)), entry())
+        found = [await backend.get(("fn", (t,))) is not None for t in ("A", "B", "C")]
+        await backend.close()
+        return found, backend.evictions
+
+    found, evictions = asyncio.run(run())
+    assert found == [False, True, True]
+    assert evictions["fn"] == 1
+
+
+def test_sqlite_sweep_and_clear(tmp_path):
+    async def run():
+        backend = sqlite_backend(tmp_path)
+        await backend.set(("fn", ("old",)), entry(ttl=-1))
+        await backend.set(("fn", ("new",)), entry())
+        swept = await backend.sweep(time.time())
+        left = await backend.usage()
+        await backend.clear()
+        cleared = await backend.usage()
+        await backend.close()
+        return swept, left, cleared
+
+    swept, left, cleared = asyncio.run(run())
+    assert swept == 1
+    assert left["fn"]["entries"] == 1
+    assert cleared == {}
+
+
+def test_cached_handler_on_sqlite(tmp_path, backend):
+    cache.set_backend(sqlite_backend(tmp_path))
+    calls = Counter()
+    app = FastAPI()
+
+    @app.get("/report")
+    @cache.cached(ttl=60)
+    async def report():
+        calls["report"] += 1
+        return Response(b"a,b\n1,2\n", status_code=202, media_type="text/csv",
+                        headers={"Content-Disposition": "attachment"})
+
+    with TestClient(app) as client:
+        responses = [client.get("/report") for _ in range(2)]
+    asyncio.run(cache._backend.close())
+    assert calls["report"] == 1
+    for response in responses:
+        assert response.status_code == 202
+        assert response.content == b"a,b\n1,2\n"
+        assert response.headers["content-disposition"] == "attachment"
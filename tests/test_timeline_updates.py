@@ -0,0 +1,246 @@
+"""
+tests/test_timeline_updates.py
+
+Timelines brought up to date incrementally must equal freshly built ones.
+
+A synthetic ticker's inputs are written to a temporary directory and its
+timelines (daily, sparse, and daily on the trading calendar) materialized.
+Each test then edits the inputs the way the pipelines do — appended price
+bars, new, late and weekend articles, a late filing, a revised price bar, a
+file rewritten unchanged — and checks that the timelines `timeline()`
+updated (spliced, or rebuilt where a splice isn't possible) match fresh
+builds, frame and parts, and so do random `align_window` slices of them.
+"""
+import json
+import os
+import random
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingestion.core import alignment
+
+TICKER = "TEST"
+
+# (mode, calendar) of every timeline kind
+KINDS = [("daily", "daily"), ("sparse", "daily"), ("daily", "trading")]
+
+# Business days of synthetic price bars
+SESSIONS = pd.bdate_range("2024-01-02", "2024-06-28")
+
+
+# Synthetic inputs
+
+def write_prices(path, days) -> None:
+    """yfinance-style CSV: three header lines, then one bar per day."""
+    lines = ["Price,Close,High,Low,Open,Volume",
+             f"Ticker,{TICKER},{TICKER},{TICKER},{TICKER},{TICKER}",
+             "Date,,,,,"]
+    for i, day in enumerate(days):
+        close = 100 + (i % 17) * 0.75
+        lines.append(f"{day:%Y-%m-%d},{close},{close + 1},{close - 1},{close - 0.5},{1_000_000 + i * 1_000}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def inputs(data_dirs):
+    """One synthetic ticker with every dataset; returns its files per dataset."""
+    files = {name: paths[0] for name, paths in alignment.source_files(TICKER).items()}
+    write_prices(files["prices"], SESSIONS)
+    files["financials"].write_text(
+        "Year,revenue_b,revenue_yoy_pct,net_margin_pct\n"
+        "2022,10.0,,12.5\n"
+        "2023,11.5,15.0,13.0\n"
+        "2024,12.1,5.2,14.1\n"
+    )
+    files["filings"].write_text(json.dumps({"filings": [
+        {"form_type": form, "filed_date": filed, "accession_number": f"0000-{i}",
+         "filing_url": f"https://example.com/filings/{i}"}
+        for i, (form, filed) in enumerate([("10-K", "2023-11-03"), ("10-Q", "2024-02-02"),
+                                           ("8-K", "2024-03-15"), ("10-Q", "2024-05-03")])
+    ]}))
+    rng = random.Random(0)
+    files["news"].write_text(json.dumps({"articles": [
+        {"title": f"article {i}", "url": f"https://example.com/news/{i}",
+         "publisher": rng.choice(["Wire", "Daily", "Weekly"]),
+         "published_at": f"{day:%Y-%m-%d}T{rng.randrange(24):02d}:30:00Z"}
+        for i, day in enumerate(rng.sample(list(pd.date_range("2024-01-01", "2024-06-30")), 60))
+    ]}))
+    files["executives"].write_text(json.dumps({
+        "fetched_at": "2024-04-01T08:00:00",
+        "executives": [{"name": "A. Person", "title": "Chief Executive Officer"},
+                       {"name": "B. Person", "title": "Chief Financial Officer"}],
+    }))
+    return files
+
+
+def rewrite(path, text: str) -> None:
+    """Write `text` and move the mtime forward, so the data version changes."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+
+
+# Input edits, as the pipelines make them
+
+def append_price_bars(files, n: int = 3) -> None:
+    lines = files["prices"].read_text().splitlines()
+    last = lines[-1].split(",")
+    days = pd.bdate_range(pd.Timestamp(last[0]) + pd.offsets.BDay(), periods=n)
+    lines += [",".join([f"{d:%Y-%m-%d}", *last[1:]]) for d in days]
+    rewrite(files["prices"], "\n".join(lines) + "\n")
+
+
+def revise_price_bar(files, back: int = 40) -> None:
+    lines = files["prices"].read_text().splitlines()
+    fields = lines[-back].split(",")
+    fields[1] = str(float(fields[1]) * 1.01)
+    lines[-back] = ",".join(fields)
+    rewrite(files["prices"], "\n".join(lines) + "\n")
+
+
+def add_article(files, published_at: str, title: str) -> None:
+    data = json.loads(files["news"].read_text())
+    data["articles"].append({"title": title, "url": f"https://example.com/news/{title}",
+                             "publisher": "Check", "published_at": published_at})
+    rewrite(files["news"], json.dumps(data))
+
+
+def add_filing(files, filed_date: str) -> None:
+    data = json.loads(files["filings"].read_text())
+    data["filings"].append({"form_type": "8-K", "filed_date": filed_date,
+                            "accession_number": f"0000-{filed_date}",
+                            "filing_url": f"https://example.com/filings/{filed_date}"})
+    rewrite(files["filings"], json.dumps(data))
+
+
+def touch(files, dataset: str) -> None:
+    rewrite(files[dataset], files[dataset].read_text())
+
+
+MIDDLE = SESSIONS[len(SESSIONS) // 2]
+
+# label: (edit, whether every kind is expected to splice rather than rebuild)
+STEPS = {
+    "appended price bars": (append_price_bars, True),
+    "new article":         (lambda f: add_article(f, "2024-07-08T15:00:00Z", "new"), False),
+    "late article":        (lambda f: add_article(f, f"{MIDDLE:%Y-%m-%d}T09:30:00Z", "late"), True),
+    "weekend article":     (lambda f: add_article(f, "2024-04-13T12:00:00Z", "weekend"), True),
+    "late filing":         (lambda f: add_filing(f, f"{MIDDLE:%Y-%m-%d}"), True),
+    "revised price bar":   (revise_price_bar, True),
+    "rewritten unchanged": (lambda f: touch(f, "news"), True),
+}
+
+
+# Comparison
+
+def windows(seed: int, n: int = 25) -> dict[tuple, pd.DataFrame]:
+    """`n` random (window, datasets) slices of every timeline kind."""
+    rng = random.Random(seed)
+    first, span = SESSIONS[0], (SESSIONS[-1] - SESSIONS[0]).days + 60
+    subsets = [None, ["prices"], ["news", "filings"], ["executives"], ["financials", "prices"]]
+    out = {}
+    for _ in range(n):
+        start = (first + pd.Timedelta(days=rng.randrange(-30, span))).date()
+        end = (pd.Timestamp(start) + pd.Timedelta(days=rng.choice([0, 3, 30, 400]))).date()
+        datasets = rng.choice(subsets)
+        for mode, calendar in KINDS:
+            key = (start, end, tuple(datasets or ()), mode, calendar)
+            out[key] = alignment.align_window(TICKER, start, end, datasets, mode, calendar)
+    return out
+
+
+def assert_same_timeline(updated: alignment.Timeline, fresh: alignment.Timeline) -> None:
+    pd.testing.assert_frame_equal(updated.frame, fresh.frame, check_freq=False)
+    assert updated.parts.keys() == fresh.parts.keys()
+    for name, part in updated.parts.items():
+        other = fresh.parts[name]
+        assert part.columns == other.columns, name
+        assert np.array_equal(part.exact, other.exact), name
+        assert part.dtypes.equals(other.dtypes), name
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Counts full timeline builds (as opposed to incremental updates)."""
+    count = {"n": 0}
+    build = alignment._build_timeline
+
+    def counting_build(*args, **kwargs):
+        count["n"] += 1
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(alignment, "_build_timeline", counting_build)
+    return count
+
+
+def check_step(files, builds, label: str, seed: int) -> None:
+    edit, splices = STEPS[label]
+    edit(files)
+    builds["n"] = 0
+    updated = {kind: alignment.timeline(TICKER, *kind) for kind in KINDS}
+    if splices:
+        assert builds["n"] == 0, f"{label}: rebuilt {builds['n']} timelines"
+    updated_windows = windows(seed)
+
+    alignment.clear_timeline_cache()
+    fresh = {kind: alignment.timeline(TICKER, *kind) for kind in KINDS}
+    for kind in KINDS:
+        assert_same_timeline(updated[kind], fresh[kind])
+    for key, window in windows(seed).items():
+        pd.testing.assert_frame_equal(updated_windows[key], window, check_freq=False, obj=str(key))
+
+
+@pytest.mark.parametrize("label", list(STEPS))
+def test_update_matches_rebuild(inputs, builds, label):
+    for kind in KINDS:
+        alignment.timeline(TICKER, *kind)
+    check_step(inputs, builds, label, seed=0)
+
+
+def test_updates_in_sequence(inputs, builds):
+    for kind in KINDS:
+        alignment.timeline(TICKER, *kind)
+    for seed, label in enumerate(STEPS):
+        check_step(inputs, builds, label, seed)
+
+
+def test_trading_calendar_keeps_rows_after_last_bar(inputs):
+    # An article after the last price bar gets a provisional session
+    add_article(inputs, "2024-07-03T15:00:00Z", "after the last bar")
+    start, end = date(2024, 6, 20), date(2024, 7, 10)
+    daily = alignment.align_window(TICKER, start, end).iloc[-1]
+    trading = alignment.align_window(TICKER, start, end, calendar="trading").iloc[-1]
+    assert trading["news_title"] == "after the last bar"
+    pd.testing.assert_series_equal(trading, daily, check_names=False)
+
+
+def test_persisted_timeline_round_trips(inputs, data_dirs, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(alignment, "PERSIST_TIMELINES", True)
+    built = {kind: alignment.timeline(TICKER, *kind) for kind in KINDS}
+    assert not list(data_dirs["timelines"].glob("*.pkl"))
+    alignment.clear_timeline_cache()
+    for kind in KINDS:
+        read = alignment.timeline(TICKER, *kind)
+        assert read is not built[kind] and read.version == built[kind].version
+        pd.testing.assert_frame_equal(read.frame, built[kind].frame)
+        assert_same_timeline(read, built[kind])
+        for name, df in built[kind].sources.items():
+            pd.testing.assert_frame_equal(read.sources[name], df)
+
+
+@pytest.mark.parametrize("ticker", ["../../escaped", "A/B", ".HIDDEN", "AAPL\n", ""])
+def test_rejects_tickers_that_are_not_symbols(data_dirs, ticker):
+    with pytest.raises(ValueError):
+        alignment.timeline(ticker)
+    with pytest.raises(ValueError):
+        alignment.align_many(["AAPL", ticker], date(2024, 1, 1), date(2024, 2, 1))
+
+
+def test_empty_panel_keeps_its_index(data_dirs):
+    panel = alignment.align_many([TICKER], date(2024, 1, 1), date(2024, 2, 1))
+    assert panel.empty
+    assert panel.index.names == ["date", "ticker"]